@@ -1,18 +1,21 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort
+from flask import (Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, g, has_app_context,
+                   Response, stream_with_context)
 from flask_caching import Cache
 from flask_compress import Compress
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
-from scraper_radgona import fetch_lmn_radgona_data, BASE_URL, parse_score
+from scraper_radgona import (fetch_lmn_radgona_data, BASE_URL, get_rate_limit_status,
+                             UpstreamCircuitOpen, upstream_circuit_is_open, get_circuit_status)
 from datetime import datetime
 from urllib.parse import urljoin
 from collections import defaultdict
 import database
+import metrics
 import os
-import hashlib
+import csv
+import io
 import json
 import logging
-import time
 
 # Configure logging - use simpler approach that works everywhere
 try:
@@ -37,11 +40,6 @@ app = Flask(__name__)
 Compress(app)
 
 
-def leaderboard_matches_hash(matches):
-    if not matches:
-        return ''
-    return hashlib.sha256(json.dumps(matches, sort_keys=True, default=str).encode()).hexdigest()
-
 # Use Redis for cache if available, else fallback to SimpleCache
 cache_config = {
     'CACHE_TYPE': 'RedisCache' if os.environ.get('REDIS_URL') else 'SimpleCache',
@@ -61,6 +59,34 @@ except Exception as db_error:
     logger.error(f"Database initialization failed: {db_error}")
     # Continue without database for debugging routes
 
+# Request-scoped database reads: routes marked with @db_request_scope run all read helpers
+# (get_cached_rounds, get_all_matches_for_league, ...) on one connection and one read-only
+# transaction; writes such as cache_matches keep their own transaction
+DB_REQUEST_SCOPE_ENABLED = os.environ.get('DB_REQUEST_SCOPE', 'true').lower() == 'true'
+database.set_request_scope_provider(lambda: g.get('db_scope') if has_app_context() else None)
+
+def db_request_scope(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if DB_REQUEST_SCOPE_ENABLED and 'db_scope' not in g:
+            g.db_scope = database.RequestScope()
+        return f(*args, **kwargs)
+    return decorated_function
+
+def release_db_request_scope():
+    """Hand the scope's connection back before a slow live scrape; the next read checks one out again"""
+    if 'db_scope' in g:
+        g.db_scope.close()
+
+@app.teardown_request
+def close_db_request_scope(exception=None):
+    scope = g.pop('db_scope', None)
+    if scope is not None:
+        try:
+            scope.close()
+        except Exception as e:
+            logger.warning(f"Closing request database scope failed: {e}")
+
 # Admin permissions
 ADMIN_PERMISSIONS = {
     'add_teams': 'Dodajanje ekip',
@@ -126,88 +152,47 @@ def inject_global_vars():
         leagues=LEAGUES_CONFIG
     )
 
-def calculate_leaderboard(all_matches_for_league, league_id):
-    # Definirajmo vse ekipe za vsako ligo (na podlagi originalne strani)
-    ALL_TEAMS = {
-        'liga_a': [
-            'Spodnja Ščavnica', 'Tiha voda', 'Lokavec', 'Podgrad', 'Plitvica', 
-            'Negova', 'Očeslavci', 'Stari hrast', 'Baren', 'Radenska', 
-            'Kapela', 'Ivanjševska slatina', 'Dinamo Radgona', 'Lešane'
-        ],
-        'liga_b': [
-            'Ihova', 'Grabonoš', 'Police', 'Bumefekt', 'Mahovci', 'Šenekar',
-            'Stavešinci', 'Segovci', 'Vrabel', 'Zoro', 'Hrastko', 'Porkys', 'Črešnjevci'
-        ]
-    }
-    
+def _empty_team_stats(league_id):
     team_stats = defaultdict(lambda: {'played': 0, 'won': 0, 'drawn': 0, 'lost': 0,
                                       'goals_for': 0, 'goals_against': 0, 'goal_difference': 0,
                                       'points': 0, 'name': '', 'css_class': ''})
-    
-    # Mapiranje imen (scraped imena -> standardna imena)
-    NAME_MAPPING = {
-        'liga_a': {
-            'Sp. Ščavnica': 'Spodnja Ščavnica',
-            'Dinamo': 'Dinamo Radgona',
-            # Dodajte druge preslikave po potrebi
-        },
-        'liga_b': {
-            # Dodajte preslikave za Liga B po potrebi
-        }
-    }
-    
     # Inicializiraj vse ekipe za to ligo z 0 vrednostmi
-    if league_id in ALL_TEAMS:
-        for team_name in ALL_TEAMS[league_id]:
+    if league_id in database.ALL_TEAMS:
+        for team_name in database.ALL_TEAMS[league_id]:
             team_stats[team_name]['name'] = team_name
-    
-    if not all_matches_for_league:
-        # Vrni vse ekipe z 0 vrednostmi, če ni tekem
+    return team_stats
+
+def leaderboard_from_standings(standings, league_id):
+    """Leaderboard from database.get_team_standings() rows - O(teams), no pass over the matches"""
+    team_stats = _empty_team_stats(league_id)
+    if not standings:
         return [stats for stats in team_stats.values()]
-    for match in all_matches_for_league:
-        home_raw = match['home_team']
-        away_raw = match['away_team']
-        score_str = match['score_str']
-        
-        # Mapiraj imena ekip na standardna imena
-        home = NAME_MAPPING.get(league_id, {}).get(home_raw, home_raw)
-        away = NAME_MAPPING.get(league_id, {}).get(away_raw, away_raw)
-        
-        # Preveri, ali sta ekipi v seznamu veljavnih ekip za to ligo
-        if league_id in ALL_TEAMS:
-            if home not in ALL_TEAMS[league_id]:
-                logger.warning(f"Neznana ekipa v {league_id}: {home} (original: {home_raw})")
-                continue
-            if away not in ALL_TEAMS[league_id]:
-                logger.warning(f"Neznana ekipa v {league_id}: {away} (original: {away_raw})")
-                continue
-        
-        # Nastavi ime ekipe če še ni nastavljeno
-        if not team_stats[home]['name']:
-            team_stats[home]['name'] = home
-        if not team_stats[away]['name']:
-            team_stats[away]['name'] = away
-        hg, ag = parse_score(score_str)
-        if hg is not None and ag is not None:
-            team_stats[home]['played'] += 1
-            team_stats[away]['played'] += 1
-            team_stats[home]['goals_for'] += hg
-            team_stats[home]['goals_against'] += ag
-            team_stats[away]['goals_for'] += ag
-            team_stats[away]['goals_against'] += hg
-            if hg > ag:
-                team_stats[home]['won'] += 1
-                team_stats[home]['points'] += 3
-                team_stats[away]['lost'] += 1
-            elif ag > hg:
-                team_stats[away]['won'] += 1
-                team_stats[away]['points'] += 3
-                team_stats[home]['lost'] += 1
-            else:
-                team_stats[home]['drawn'] += 1
-                team_stats[away]['drawn'] += 1
-                team_stats[home]['points'] += 1
-                team_stats[away]['points'] += 1
+    for row in standings:
+        team = database.NAME_MAPPING.get(league_id, {}).get(row['team'], row['team'])
+        if league_id in database.ALL_TEAMS and team not in database.ALL_TEAMS[league_id]:
+            if row['played']:
+                logger.warning(f"Neznana ekipa v {league_id}: {team} (original: {row['team']})")
+            continue
+        team_stats[team]['name'] = team
+        for column in database.STANDINGS_COLUMNS:
+            team_stats[team][column] += row[column]
+    return _rank_leaderboard(team_stats, league_id)
+
+def refresh_leaderboard(league_id):
+    """
+    Full recompute: rebuild the league's standings from its matches and store the leaderboard JSON.
+    Skipped when the matches' DB fingerprint equals the one stored with the last recompute.
+    """
+    fingerprint = database.get_league_fingerprint(league_id)
+    leaderboard_data = database.get_cached_leaderboard(league_id, source_hash=fingerprint)
+    if leaderboard_data is not None:
+        return leaderboard_data
+    database.rebuild_team_standings(league_id)
+    leaderboard_data = leaderboard_from_standings(database.get_team_standings(league_id), league_id)
+    database.cache_leaderboard(league_id, leaderboard_data, fingerprint)
+    return leaderboard_data
+
+def _rank_leaderboard(team_stats, league_id):
     leaderboard = []
     for team, stats in team_stats.items():
         stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
@@ -236,6 +221,14 @@ def health_check():
     """Simple health check"""
     return {'status': 'ok', 'timestamp': datetime.now().isoformat()}, 200
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Scraper metrics of this process in Prometheus text format (METRICS_TOKEN enables bearer auth)"""
+    token = os.environ.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return 'Unauthorized', 401, {'Content-Type': 'text/plain; charset=utf-8'}
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+
 @app.route('/')
 def index():
     return redirect(url_for('home'))
@@ -243,6 +236,7 @@ def index():
 
 @cache.cached(timeout=180, query_string=True)  # Reduced cache time for faster updates
 @app.route('/league/<league_id>/results', methods=['GET', 'POST'])
+@db_request_scope
 def show_league_results(league_id):
     try:
         if league_id not in LEAGUES_CONFIG:
@@ -277,7 +271,9 @@ def show_league_results(league_id):
                     current_round_from_cache = next((r for r in available_rounds if r.get('name') == recent_round_name), None)
         
         # If no cached rounds and scraping enabled, try to get them
-        if not available_rounds and scraping_enabled:
+        # (not while the upstream circuit is open - that scrape would only tie up the worker)
+        if not available_rounds and scraping_enabled and not upstream_circuit_is_open():
+            release_db_request_scope()
             try:
                 _, _, scraped_rounds, scraped_initial = fetch_lmn_radgona_data(
                     league_config["main_results_page_url"], fetch_all_rounds_data=False, league_id_for_caching=league_id)
@@ -316,8 +312,10 @@ def show_league_results(league_id):
         if page_matches is None:
             # Check if scraping is disabled in production (default to disabled for safety)
             scraping_enabled = os.environ.get('ENABLE_SCRAPING', 'false').lower() == 'true'
+            circuit_open = scraping_enabled and upstream_circuit_is_open()
             
-            if scraping_enabled:
+            if scraping_enabled and not circuit_open:
+                release_db_request_scope()
                 try:
                     # Add timeout protection for web requests
                     import signal
@@ -357,7 +355,9 @@ def show_league_results(league_id):
                     except:
                         pass
                     
-                    if "415" in str(scrape_error) or "Unsupported Media Type" in str(scrape_error):
+                    if isinstance(scrape_error, UpstreamCircuitOpen):
+                        logger.warning(f"{scrape_error} for {target_round_url}, using cached data only")
+                    elif "415" in str(scrape_error) or "Unsupported Media Type" in str(scrape_error):
                         logger.warning(f"Server blocking detected (415) for {target_round_url}, using cached data only")
                     elif "Cloudflare" in str(scrape_error):
                         logger.warning(f"Cloudflare blocking detected for round {target_round_url}, using cached data only")
@@ -367,7 +367,8 @@ def show_league_results(league_id):
                     if not round_details:
                         round_details = {'name': 'Napaka pri nalaganju', 'url': target_round_url}
             else:
-                logger.info(f"Scraping disabled, using cached data only for {target_round_url}")
+                logger.info(f"Scraping {'paused (upstream circuit open)' if circuit_open else 'disabled'}, "
+                            f"using cached data only for {target_round_url}")
                 # Try to get any available matches from the league instead of empty list
                 all_league_matches = database.get_all_matches_for_league(league_id)
                 if all_league_matches:
@@ -446,8 +447,21 @@ def show_league_results(league_id):
                 'venue': 'League suspended until March 2026'
             }]
 
+        # Goals and cards of the displayed matches with admin results, one query; the page opens them without a request
+        match_details = {}
+        if MATCH_DETAILS_EMBED and filtered_matches:
+            try:
+                match_ids = [database.make_match_unique_id(league_id, m) for m in filtered_matches]
+                match_details = {match_id: format_match_details(d) for match_id, d in
+                                 database.get_match_details_for_ids(league_id, match_ids, with_results_only=True).items()}
+            except Exception as e:
+                logger.warning(f"Could not embed match details for {league_id}: {str(e)}")
+
         return render_template('results_radgona.html',
                                grouped_results=dict(grouped_data),
+                               match_details=match_details,
+                               match_details_embedded=MATCH_DETAILS_EMBED,
+                               match_details_batch_max=MATCH_DETAILS_BATCH_MAX,
                                all_rounds=available_rounds or [],
                                current_selected_url=target_round_url,
                                page_title_main=f"LMN Radgona: {league_config['display_name']}",
@@ -466,6 +480,7 @@ def show_league_results(league_id):
             return f"<h1>Napaka pri pridobivanju rezultatov</h1><p>Koda napake: 500</p><p><a href='/'>Nazaj na domačo stran</a></p>", 500
 
 @app.route('/league/<league_id>/leaderboard')
+@db_request_scope
 def show_leaderboard(league_id):
     try:
         if league_id not in LEAGUES_CONFIG:
@@ -478,12 +493,14 @@ def show_leaderboard(league_id):
             database.clear_league_cache(league_id)
             cache.clear()
             logger.info(f"Cache cleared for {league_id}")
-        leaderboard_data = None if force_refresh else database.get_cached_leaderboard(league_id)
+        # Standings move with every match write - reading them is the whole leaderboard cost
+        standings = None if force_refresh else database.get_team_standings(league_id)
 
-        if leaderboard_data is None or force_refresh:
+        if not standings:
             rounds = database.get_cached_rounds(league_id)
             current_round_info = None
             if not rounds:
+                release_db_request_scope()
                 _, _, rounds, current_round_info = fetch_lmn_radgona_data(
                     LEAGUES_CONFIG[league_id]['main_results_page_url'], fetch_all_rounds_data=False, league_id_for_caching=league_id)
                 if rounds:
@@ -491,19 +508,17 @@ def show_leaderboard(league_id):
             if rounds:
                 current_round_info = rounds[-1] if not current_round_info else current_round_info
                 if database.get_cached_round_matches(league_id, current_round_info['url']) is None:
+                    release_db_request_scope()
                     scraped, _, _, _ = fetch_lmn_radgona_data(current_round_info['url'], fetch_all_rounds_data=False, league_id_for_caching=league_id)
                     if scraped:
                         database.cache_matches(league_id, current_round_info['url'], scraped)
-            # Fast leaderboard loading - use cached data only
-        logger.info(f"Loading leaderboard for {league_id} from cached data")
-        all_matches = database.get_all_matches_for_league(league_id)
-        if not all_matches:
-            logger.warning(f"No cached data available for {league_id}")
-            all_matches = []
-            
-        leaderboard_data = calculate_leaderboard(all_matches, league_id)
-        if leaderboard_data:
-            database.cache_leaderboard(league_id, leaderboard_data)
+            if force_refresh:
+                refresh_leaderboard(league_id)
+            standings = database.get_team_standings(league_id)
+            if not standings:
+                logger.warning(f"No cached data available for {league_id}")
+
+        leaderboard_data = leaderboard_from_standings(standings, league_id)
 
         return render_template('leaderboard.html',
                                leaderboard_data=leaderboard_data,
@@ -526,7 +541,67 @@ def show_leaderboard(league_id):
 def home():
     return render_template('home.html')
 
+def format_match_details(details):
+    """API shape of database.get_match_details() output: match, goals and cards per side, has_details"""
+    return {
+        'match': {
+            'home_team': details['match']['home_team'],
+            'away_team': details['match']['away_team'],
+            'score': details['match']['score_str'],
+            'date': details['match']['date_str'],
+            'time': details['match']['time'],
+            'venue': details['match']['venue']
+        },
+        'goals': {
+            'home': [
+                {
+                    'player': g['player_name'],
+                    'jersey_number': g.get('jersey_number'),
+                    'minute': g.get('minute'),
+                    'type': g.get('goal_type', 'regular'),
+                    'assist': g.get('assist_player_name')
+                }
+                for g in details['goals']['home']
+            ],
+            'away': [
+                {
+                    'player': g['player_name'],
+                    'jersey_number': g.get('jersey_number'),
+                    'minute': g.get('minute'),
+                    'type': g.get('goal_type', 'regular'),
+                    'assist': g.get('assist_player_name')
+                }
+                for g in details['goals']['away']
+            ]
+        },
+        'cards': {
+            'home': [
+                {
+                    'player': c['player_name'],
+                    'jersey_number': c.get('jersey_number'),
+                    'card_type': c['card_type'],
+                    'minute': c.get('minute'),
+                    'reason': c.get('reason')
+                }
+                for c in details['cards']['home']
+            ],
+            'away': [
+                {
+                    'player': c['player_name'],
+                    'jersey_number': c.get('jersey_number'),
+                    'card_type': c['card_type'],
+                    'minute': c.get('minute'),
+                    'reason': c.get('reason')
+                }
+                for c in details['cards']['away']
+            ]
+        },
+        'has_details': len(details['goals']['home']) > 0 or len(details['goals']['away']) > 0 or 
+                      len(details['cards']['home']) > 0 or len(details['cards']['away']) > 0
+    }
+
 @app.route('/api/match-details/<league_id>/<path:match_unique_id>')
+@db_request_scope
 def get_match_details_api(league_id, match_unique_id):
     """API endpoint to get match details (goals and cards)"""
     try:
@@ -539,63 +614,7 @@ def get_match_details_api(league_id, match_unique_id):
         if not match_details:
             return jsonify({'error': 'Match not found'}), 404
         
-        # Format the response
-        response = {
-            'match': {
-                'home_team': match_details['match']['home_team'],
-                'away_team': match_details['match']['away_team'],
-                'score': match_details['match']['score_str'],
-                'date': match_details['match']['date_str'],
-                'time': match_details['match']['time'],
-                'venue': match_details['match']['venue']
-            },
-            'goals': {
-                'home': [
-                    {
-                        'player': g['player_name'],
-                        'jersey_number': g.get('jersey_number'),
-                        'minute': g.get('minute'),
-                        'type': g.get('goal_type', 'regular'),
-                        'assist': g.get('assist_player_name')
-                    }
-                    for g in match_details['goals']['home']
-                ],
-                'away': [
-                    {
-                        'player': g['player_name'],
-                        'jersey_number': g.get('jersey_number'),
-                        'minute': g.get('minute'),
-                        'type': g.get('goal_type', 'regular'),
-                        'assist': g.get('assist_player_name')
-                    }
-                    for g in match_details['goals']['away']
-                ]
-            },
-            'cards': {
-                'home': [
-                    {
-                        'player': c['player_name'],
-                        'jersey_number': c.get('jersey_number'),
-                        'card_type': c['card_type'],
-                        'minute': c.get('minute'),
-                        'reason': c.get('reason')
-                    }
-                    for c in match_details['cards']['home']
-                ],
-                'away': [
-                    {
-                        'player': c['player_name'],
-                        'jersey_number': c.get('jersey_number'),
-                        'card_type': c['card_type'],
-                        'minute': c.get('minute'),
-                        'reason': c.get('reason')
-                    }
-                    for c in match_details['cards']['away']
-                ]
-            },
-            'has_details': len(match_details['goals']['home']) > 0 or len(match_details['goals']['away']) > 0 or 
-                          len(match_details['cards']['home']) > 0 or len(match_details['cards']['away']) > 0
-        }
+        response = format_match_details(match_details)
         
         return jsonify(response), 200
         
@@ -603,6 +622,51 @@ def get_match_details_api(league_id, match_unique_id):
         logger.error(f"Error getting match details for {match_unique_id}: {str(e)}")
         return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
 
+# Batch details for the results page: every match of a round (?round_url=) or the listed
+# matches (?id=...&id=..., ids contain commas) in one query; the cached response is keyed by query string
+MATCH_DETAILS_BATCH_MAX = 100
+MATCH_DETAILS_CACHE_SECONDS = int(os.environ.get('MATCH_DETAILS_CACHE_SECONDS', 120))
+# Embed the details of the displayed matches into results_radgona.html, so opening one needs no request.
+# Off by default: the match card click handler in the template is still commented out.
+MATCH_DETAILS_EMBED = os.environ.get('MATCH_DETAILS_EMBED', 'false').lower() == 'true'
+
+def successful_response(rv):
+    """response_filter for @cache.cached - error responses (4xx/5xx tuples) are not cached"""
+    status = rv[1] if isinstance(rv, tuple) and len(rv) > 1 else getattr(rv, 'status_code', 200)
+    return status == 200
+
+@app.route('/api/match-details/<league_id>')
+@cache.cached(timeout=MATCH_DETAILS_CACHE_SECONDS, query_string=True, response_filter=successful_response)
+@db_request_scope
+def get_match_details_batch_api(league_id):
+    """API endpoint to get the details of a whole round (or of many matches) in one response"""
+    try:
+        if league_id not in LEAGUES_CONFIG:
+            return jsonify({'error': 'Invalid league ID'}), 404
+
+        match_ids = request.args.getlist('id')
+        round_url = request.args.get('round_url')
+        if len(match_ids) > MATCH_DETAILS_BATCH_MAX:
+            return jsonify({'error': f'At most {MATCH_DETAILS_BATCH_MAX} match ids per request'}), 400
+        if match_ids:
+            details = database.get_match_details_for_ids(league_id, match_ids)
+        elif round_url:
+            details = database.get_match_details_for_round(league_id, round_url)
+        else:
+            return jsonify({'error': 'round_url or id required'}), 400
+
+        response = jsonify({
+            'league_id': league_id,
+            'round_url': round_url,
+            'matches': {match_id: format_match_details(d) for match_id, d in details.items()}
+        })
+        response.headers['Cache-Control'] = f'public, max-age={MATCH_DETAILS_CACHE_SECONDS}'
+        return response
+
+    except Exception as e:
+        logger.error(f"Error getting batch match details for {league_id}: {str(e)}")
+        return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
+
 @app.route('/admin/clear-cache/<league_id>')
 def clear_cache(league_id):
     """Admin route to clear cache for a specific league"""
@@ -624,16 +688,11 @@ def fix_missing_teams(league_id):
         return "Invalid league ID", 404
     
     try:
-        # Clear cache first
-        database.clear_league_cache(league_id)
+        # Rendered pages only - the stored leaderboard is what refresh_leaderboard compares against
         cache.clear()
         
-        # Force refresh leaderboard with all teams
-        all_matches = database.get_all_matches_for_league(league_id)
-        leaderboard_data = calculate_leaderboard(all_matches, league_id)
-        
-        if leaderboard_data:
-            database.cache_leaderboard(league_id, leaderboard_data)
+        # Force refresh leaderboard with all teams (skipped while matches and teams are unchanged)
+        leaderboard_data = refresh_leaderboard(league_id)
         
         return f"Fixed teams for {LEAGUES_CONFIG[league_id]['name']}. Found {len(leaderboard_data)} teams.", 200
         
@@ -692,8 +751,8 @@ def admin_status():
         try:
             liga_a_matches = database.get_all_matches_for_league('liga_a') or []
             liga_b_matches = database.get_all_matches_for_league('liga_b') or []
-            liga_a_leaderboard = database.get_cached_leaderboard('liga_a')
-            liga_b_leaderboard = database.get_cached_leaderboard('liga_b')
+            liga_a_leaderboard = database.get_team_standings('liga_a')
+            liga_b_leaderboard = database.get_team_standings('liga_b')
             liga_a_rounds = database.get_cached_rounds('liga_a') or []
             liga_b_rounds = database.get_cached_rounds('liga_b') or []
         except Exception as e:
@@ -707,6 +766,9 @@ def admin_status():
             'scraping_enabled': scraping_enabled,
             'is_production': is_production,
             'effective_scraping': scraping_enabled and not is_production,
+            'scraper_rate_limit': get_rate_limit_status(),
+            'scraper_circuit': get_circuit_status(),
+            'db_pool': database.get_pool_stats(),
             'cached_data': {
                 'liga_a_matches': len(liga_a_matches),
                 'liga_b_matches': len(liga_b_matches),
@@ -1313,6 +1375,35 @@ def admin_match_results():
         flash('Napaka pri pridobivanju rezultatov tekem', 'error')
         return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/match-results/export.csv')
+@admin_required
+@permission_required('manage_results')
+def admin_export_match_results():
+    """CSV of every match with its result (?league=<id>: all seasons of one league, every column)"""
+    league_id = request.args.get('league')
+    if league_id and league_id not in LEAGUES_CONFIG:
+        abort(404)
+    rows = database.iter_matches_for_league(league_id) if league_id else database.iter_matches_for_results()
+
+    def generate():
+        # Rows come from a server-side cursor in batches - the export never sits in memory whole
+        buffer = io.StringIO()
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+            if buffer.tell() > 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    filename = f"tekme_{league_id or 'vse'}_{datetime.now():%Y%m%d}.csv"
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
 @app.route('/admin/match-results/<string:match_id>/edit')
 @admin_required
 @permission_required('manage_results')
@@ -1629,76 +1720,24 @@ def cron_scrape_leagues():
     logger.info(f"Starting scheduled scrape from {request.remote_addr}")
     
     # Import scraper function
-    from scraper_radgona import fetch_lmn_radgona_data, DATABASE_AVAILABLE, cache_matches
+    from scraper_radgona import scrape_leagues, DATABASE_AVAILABLE
     
     if not DATABASE_AVAILABLE:
         return jsonify({'error': 'Database not available'}), 503
     
-    # Define leagues to scrape
-    leagues = [
-        {
-            'id': 'liga_a',
-            'name': 'Liga A',
-            'url': 'https://www.lmn-radgona.si/index.php/ct-menu-item-7/razpored-liga-a'
-        },
-        {
-            'id': 'liga_b',
-            'name': 'Liga B',
-            'url': 'https://www.lmn-radgona.si/index.php/2017-08-11-13-54-06/razpored-liga-b'
-        }
-    ]
-    
-    results = {
-        'timestamp': datetime.now().isoformat(),
-        'leagues': [],
-        'total_matches_scraped': 0,
-        'total_matches_saved': 0
-    }
-    
-    for league in leagues:
-        league_result = {
-            'id': league['id'],
-            'name': league['name'],
-            'status': 'pending',
-            'matches_scraped': 0,
-            'matches_saved': 0,
-            'current_round': None,
-            'error': None
-        }
-        
-        try:
-            logger.info(f"Scraping {league['name']}...")
-            
-            # Fetch only current round
-            page_matches, _, available_rounds, current_round_info = fetch_lmn_radgona_data(
-                league['url'], 
-                fetch_all_rounds_data=False
-            )
-            
-            league_result['matches_scraped'] = len(page_matches)
-            league_result['current_round'] = current_round_info.get('name', 'N/A')
-            results['total_matches_scraped'] += len(page_matches)
-            
-            # Save to database
-            if page_matches:
-                cache_matches(league['id'], current_round_info['url'], page_matches)
-                league_result['matches_saved'] = len(page_matches)
-                results['total_matches_saved'] += len(page_matches)
-                league_result['status'] = 'success'
-                logger.info(f"Successfully scraped and saved {len(page_matches)} matches for {league['name']}")
-            else:
-                league_result['status'] = 'success_no_matches'
-                logger.warning(f"No matches found for {league['name']}")
-                
-        except Exception as e:
-            league_result['status'] = 'error'
-            league_result['error'] = str(e)
-            logger.error(f"Error scraping {league['name']}: {e}")
-        
-        results['leagues'].append(league_result)
+    # All leagues run concurrently under one deadline counted from submission, so the request
+    # takes as long as the slowest league (at most the deadline) instead of the sum of all of them
+    sync_rounds = request.args.get('sync', 'false').lower() == 'true'
+    results = scrape_leagues(sync_rounds=sync_rounds)
+    for league_result in results['leagues']:
+        if league_result['status'] in ['success', 'success_no_matches']:
+            logger.info(f"{league_result['name']}: {league_result['matches_saved']} matches saved in "
+                        f"{league_result['timings'].get('total_seconds', 0)}s")
+        else:
+            logger.error(f"Error scraping {league_result['name']}: {league_result['error']}")
     
-    # Determine overall status
-    results['status'] = 'success' if all(l['status'] in ['success', 'success_no_matches'] for l in results['leagues']) else 'partial_failure'
+    results['rate_limit'] = get_rate_limit_status()
+    results['circuit'] = get_circuit_status()
     
     logger.info(f"Scraping completed: {results['total_matches_scraped']} matches scraped, {results['total_matches_saved']} saved")
     
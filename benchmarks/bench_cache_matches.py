@@ -0,0 +1,120 @@
+"""
+Match writes at backfill scale: the previous cache_matches (one executemany upsert per round,
+one round trip per row) against cache_matches_bulk (one multi-row INSERT ... ON CONFLICT merge
+per 1000 rows). The previous path is copied verbatim, so it writes no standings deltas or
+round freshness.
+
+Writes throwaway leagues (bench_*) to DATABASE_URL and deletes them afterwards.
+
+Usage:
+    python benchmarks/bench_cache_matches.py                      # 12000 rows, 10 per round
+    python benchmarks/bench_cache_matches.py --rows 50000 --per-round 12
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+def build_rounds(rows, per_round, score='-'):
+    """{round_url: [match dicts]} shaped like the parser output"""
+    rounds = {}
+    for i in range(rows):
+        round_no = i // per_round + 1
+        round_url = f"https://bench.invalid/krog/{round_no}"
+        played = date(2020, 9, 5) + timedelta(days=7 * round_no)
+        rounds.setdefault(round_url, []).append({
+            'round_name': f"{round_no}. krog", 'round_url': round_url,
+            'date_str': played.strftime('%d.%m.%Y'), 'date_obj': played, 'time': '20:00',
+            'home_team': f"Home{i % per_round}", 'away_team': f"Away{i % per_round}",
+            'score_str': score, 'venue': 'Dvorana',
+        })
+    return rounds
+
+
+def legacy_write(league_id, rounds):
+    """database.cache_matches as it was before cache_matches_bulk: one executemany upsert per round"""
+    for round_url, matches_data in rounds.items():
+        now = datetime.now()
+        with database.db_cursor() as cursor:
+            params = []
+            for match in matches_data:
+                date_obj_val = match['date_obj'] if match['date_obj'] else None
+                match_unique_id = f"{league_id}_{match['home_team']}_{match['away_team']}_{match.get('round_name', 'unknownround')}_{match.get('date_str', 'nodate')}"
+                params.append((
+                    match_unique_id, league_id, match.get('round_name'), round_url,
+                    match['date_str'], date_obj_val, match['time'],
+                    match['home_team'], match['away_team'], match['score_str'],
+                    match['venue'], now
+                ))
+            cursor.executemany('''
+                INSERT INTO matches 
+                (match_unique_id, league_id, round_name, round_url, date_str, date_obj, time, home_team, away_team, score_str, venue, last_scraped)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (match_unique_id) DO UPDATE SET
+                    score_str = EXCLUDED.score_str,
+                    last_scraped = EXCLUDED.last_scraped
+            ''', params)
+
+
+def bulk_write(league_id, rounds):
+    return database.summarize_changes(database.cache_matches_bulk(league_id, rounds))
+
+
+def per_round_write(league_id, rounds):
+    return database.summarize_changes(
+        [database.cache_matches(league_id, round_url, matches) for round_url, matches in rounds.items()])
+
+
+def clear(*league_ids):
+    """Remove everything the write paths leave behind (matches, standings, freshness, leaderboards)"""
+    for league_id in league_ids:
+        database.clear_league_cache(league_id)
+
+
+def timed(write, league_id, rounds):
+    # cache_matches prints one line per round - keep the report readable
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        start = time.perf_counter()
+        result = write(league_id, rounds)
+        return time.perf_counter() - start, result
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=12000)
+    arg_parser.add_argument('--per-round', type=int, default=10, help='matches per round')
+    args = arg_parser.parse_args()
+
+    database.init_db_pool()
+    fresh = build_rounds(args.rows, args.per_round)
+    scored = build_rounds(args.rows, args.per_round, score='2 - 1')
+    paths = [('executemany (previous)', 'bench_legacy', legacy_write),
+             ('cache_matches per round', 'bench_round', per_round_write),
+             ('cache_matches_bulk', 'bench_bulk', bulk_write)]
+    clear(*(league_id for _, league_id, _ in paths))
+
+    print(f"{args.rows} rows in {len(fresh)} rounds")
+    print(f"{'path':<26} {'insert s':>9} {'rows/s':>9} {'update s':>9} {'rows/s':>9}  inserted/updated")
+    try:
+        for label, league_id, write in paths:
+            insert_seconds, inserted = timed(write, league_id, fresh)
+            update_seconds, updated = timed(write, league_id, scored)
+            counts = f"{inserted['inserted']}/{updated['updated']}" if inserted else '-'
+            print(f"{label:<26} {insert_seconds:>9.2f} {args.rows / insert_seconds:>9.0f} "
+                  f"{update_seconds:>9.2f} {args.rows / update_seconds:>9.0f}  {counts}")
+    finally:
+        clear(*(league_id for _, league_id, _ in paths))
+
+
+if __name__ == '__main__':
+    main()
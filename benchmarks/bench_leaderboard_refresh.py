@@ -0,0 +1,101 @@
+"""
+Cost of app_radgona.refresh_leaderboard (?force=true, /admin/fix-teams): the full standings
+rebuild against a repeat refresh over unchanged matches, which the DB fingerprint gate skips.
+
+Seeds a throwaway league (bench_leaderboard) in DATABASE_URL and deletes it afterwards. Exits 1
+when a repeat refresh rebuilds anyway, a changed score does not trigger a rebuild, or the
+gated leaderboard differs from a fresh rebuild.
+
+Usage:
+    python benchmarks/bench_leaderboard_refresh.py                 # 26 rounds x 6 matches, 50 refreshes
+    python benchmarks/bench_leaderboard_refresh.py --rounds 200 --per-round 8 --requests 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from benchmarks.bench_cache_matches import build_rounds
+
+LEAGUE_ID = 'bench_leaderboard'
+rebuilds = 0
+
+
+def counting_rebuild(rebuild):
+    def wrapper(league_id):
+        global rebuilds
+        rebuilds += 1
+        return rebuild(league_id)
+    return wrapper
+
+
+def timed_refreshes(refresh, requests):
+    global rebuilds
+    rebuilds = 0
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        data = refresh(LEAGUE_ID)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, data, rebuilds
+
+
+def clear():
+    database.clear_league_cache(LEAGUE_ID)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rounds', type=int, default=26)
+    arg_parser.add_argument('--per-round', type=int, default=6, help='matches per round')
+    arg_parser.add_argument('--requests', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    import app_radgona
+    rounds = build_rounds(args.rounds * args.per_round, args.per_round, score='2 - 1')
+    clear()
+    database.cache_matches_bulk(LEAGUE_ID, rounds)
+
+    plain_rebuild = database.rebuild_team_standings
+    database.rebuild_team_standings = counting_rebuild(plain_rebuild)
+    failures = []
+    try:
+        first, reference, first_rebuilds = timed_refreshes(app_radgona.refresh_leaderboard, 1)
+        repeat, gated, repeat_rebuilds = timed_refreshes(app_radgona.refresh_leaderboard, args.requests)
+        if repeat_rebuilds:
+            failures.append(f"{repeat_rebuilds} of {args.requests} refreshes over unchanged matches rebuilt the standings")
+        if gated != reference:
+            failures.append("gated leaderboard differs from the rebuilt one")
+
+        round_url, matches = next(iter(rounds.items()))
+        database.cache_matches(LEAGUE_ID, round_url, [dict(matches[0], score_str='0 - 4')] + matches[1:])
+        changed, changed_data, changed_rebuilds = timed_refreshes(app_radgona.refresh_leaderboard, 1)
+        if changed_rebuilds != 1:
+            failures.append("a changed score did not rebuild the standings")
+        plain_rebuild(LEAGUE_ID)
+        if changed_data != app_radgona.leaderboard_from_standings(database.get_team_standings(LEAGUE_ID), LEAGUE_ID):
+            failures.append("leaderboard after the score change differs from a fresh rebuild")
+    finally:
+        database.rebuild_team_standings = plain_rebuild
+        clear()
+
+    print(f"{args.rounds * args.per_round} matches, {args.requests} repeat refreshes")
+    print(f"{'refresh':<26} {'mean ms':>8} {'p50 ms':>8} {'rebuilds':>9}")
+    for label, samples, count in (('first (rebuild)', first, first_rebuilds),
+                                  ('repeat, matches unchanged', repeat, repeat_rebuilds),
+                                  ('after a score change', changed, changed_rebuilds)):
+        samples.sort()
+        print(f"{label:<26} {statistics.mean(samples):>8.2f} {samples[len(samples) // 2]:>8.2f} {count:>9}")
+    if failures:
+        print()
+        for line in failures:
+            print(f"  - {line}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
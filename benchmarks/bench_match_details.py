@@ -0,0 +1,179 @@
+"""
+Latency of /api/match-details/<league_id>/<match_unique_id>: the previous four sequential
+queries against the single json_agg statement in database.get_match_details.
+
+Seeds a throwaway league (bench_details) with a match, its result, goals and cards in
+DATABASE_URL and deletes it afterwards. Responses of both paths must be identical.
+
+Usage:
+    python benchmarks/bench_match_details.py                      # 500 requests per path
+    python benchmarks/bench_match_details.py --requests 2000 --goals 8 --cards 4
+    python benchmarks/bench_match_details.py --rtt-ms 1.5     # model a database across the network
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+LEAGUE_ID = 'bench_details'
+statements = 0
+
+
+class _DelayedCursor:
+    """Cursor proxy that counts statements and adds a fixed round-trip delay to each"""
+    def __init__(self, cursor, rtt):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, *args, **kwargs):
+        global statements
+        statements += 1
+        if self._rtt:
+            time.sleep(self._rtt)
+        return self._cursor.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def delayed_db_cursor(db_cursor, rtt):
+    @contextmanager
+    def wrapper(*args, **kwargs):
+        with db_cursor(*args, **kwargs) as cursor:
+            yield _DelayedCursor(cursor, rtt)
+    return wrapper
+
+
+def legacy_get_match_details(match_unique_id, league_id):
+    """The previous get_match_details: match, result, goals and cards as four queries, split in Python"""
+    with database.db_cursor(read_only=True) as cursor:
+        cursor.execute("SELECT * FROM matches WHERE match_unique_id = %s", (match_unique_id,))
+        match = cursor.fetchone()
+        if not match:
+            return None
+        cursor.execute("SELECT * FROM match_results WHERE match_id = %s", (match_unique_id,))
+        match_result = cursor.fetchone()
+        if not match_result:
+            return {'match': dict(match), 'goals': {'home': [], 'away': []}, 'cards': {'home': [], 'away': []}}
+        cursor.execute("""
+            SELECT g.*, p.name as player_name, p.jersey_number, t.name as team_name,
+                   ap.name as assist_player_name
+            FROM goals g
+            JOIN players p ON g.player_id = p.id
+            JOIN teams t ON g.team_id = t.id
+            LEFT JOIN players ap ON g.assist_player_id = ap.id
+            WHERE g.match_result_id = %s
+            ORDER BY g.minute
+        """, (match_result['id'],))
+        all_goals = cursor.fetchall()
+        cursor.execute("""
+            SELECT mc.*, p.name as player_name, p.jersey_number, t.name as team_name
+            FROM match_cards mc
+            JOIN players p ON mc.player_id = p.id
+            JOIN teams t ON mc.team_id = t.id
+            WHERE mc.match_result_id = %s
+            ORDER BY mc.minute
+        """, (match_result['id'],))
+        all_cards = cursor.fetchall()
+    home_team, away_team = match['home_team'], match['away_team']
+    return {
+        'match': dict(match),
+        'match_result': dict(match_result),
+        'goals': {'home': [dict(g) for g in all_goals if g['team_name'] == home_team],
+                  'away': [dict(g) for g in all_goals if g['team_name'] == away_team]},
+        'cards': {'home': [dict(c) for c in all_cards if c['team_name'] == home_team],
+                  'away': [dict(c) for c in all_cards if c['team_name'] == away_team]},
+    }
+
+
+def seed(goals, cards):
+    """One played match with an admin result, `goals` goals and `cards` cards; returns its id"""
+    match = {'round_name': '1. krog', 'round_url': 'https://bench.invalid/krog/1', 'date_str': '06.09.2025',
+             'date_obj': date(2025, 9, 6), 'time': '20:00', 'home_team': 'Bench Home', 'away_team': 'Bench Away',
+             'score_str': f"{goals - goals // 2} - {goals // 2}", 'venue': 'Dvorana'}
+    database.cache_matches(LEAGUE_ID, match['round_url'], [match])
+    match_id = database.make_match_unique_id(LEAGUE_ID, match)
+    team_ids = [database.create_team(match['home_team'], LEAGUE_ID), database.create_team(match['away_team'], LEAGUE_ID)]
+    players = [[database.create_player(f"Igralec {side}{n}", team_id, n) for n in range(1, 8)]
+               for side, team_id in zip('HA', team_ids)]
+    result_id = database.create_match_result(match_id, team_ids[0], team_ids[1], goals - goals // 2, goals // 2)
+    for i in range(goals):
+        side = i % 2
+        database.add_goal(result_id, players[side][i % 7], team_ids[side], 3 + i * 5,
+                          assist_player_id=players[side][(i + 1) % 7])
+    for i in range(cards):
+        side = i % 2
+        database.add_card(result_id, players[side][i % 7], team_ids[side], 'yellow' if i % 3 else 'red', 10 + i * 7)
+    return match_id
+
+
+def clear():
+    with database.db_cursor() as cursor:
+        cursor.execute("DELETE FROM match_results WHERE match_id IN (SELECT match_unique_id FROM matches WHERE league_id = %s)",
+                       (LEAGUE_ID,))
+        cursor.execute("DELETE FROM teams WHERE league_id = %s", (LEAGUE_ID,))
+    database.clear_league_cache(LEAGUE_ID)
+
+
+def measure(client, url, requests):
+    global statements
+    client.get(url)
+    samples = []
+    statements = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, response.get_json(), statements / requests
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--requests', type=int, default=500)
+    arg_parser.add_argument('--goals', type=int, default=6)
+    arg_parser.add_argument('--cards', type=int, default=3)
+    arg_parser.add_argument('--rtt-ms', type=float, default=0, help='delay added to every statement (network round trip)')
+    args = arg_parser.parse_args()
+
+    import app_radgona
+    app_radgona.LEAGUES_CONFIG.setdefault(LEAGUE_ID, {})
+    client = app_radgona.app.test_client()
+    clear()
+    match_id = seed(args.goals, args.cards)
+    url = f"/api/match-details/{LEAGUE_ID}/{match_id}"
+
+    single_query = database.get_match_details
+    plain_db_cursor = database.db_cursor
+    database.db_cursor = delayed_db_cursor(plain_db_cursor, args.rtt_ms / 1000)
+    results = {}
+    try:
+        for label, implementation in (('4 queries (previous)', legacy_get_match_details),
+                                      ('json_agg, 1 query', single_query)):
+            database.get_match_details = implementation
+            results[label] = measure(client, url, args.requests)
+    finally:
+        database.get_match_details = single_query
+        database.db_cursor = plain_db_cursor
+        clear()
+
+    print(f"{url}\n{args.requests} requests, {args.goals} goals, {args.cards} cards, +{args.rtt_ms:g} ms per statement")
+    print(f"{'path':<22} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'statements':>11}")
+    for label, (samples, _, per_request) in results.items():
+        samples.sort()
+        print(f"{label:<22} {statistics.mean(samples):>8.2f} {samples[len(samples) // 2]:>8.2f} "
+              f"{samples[int(len(samples) * 0.95)]:>8.2f} {per_request:>11.1f}")
+    bodies = [body for _, body, _ in results.values()]
+    if bodies[0] != bodies[1]:
+        print("\nResponses differ between the two paths")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
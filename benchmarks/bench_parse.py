@@ -0,0 +1,263 @@
+"""
+Parser benchmarks.
+
+Default: compare the full html.parser tree with the targeted fast parsing path and check
+that both produce the same rounds and matches.
+
+--check: per-call, per-page and per-row timings plus peak memory for the scraper's
+parsing functions, compared with benchmarks/baseline.json (exit 1 on regression).
+Fixture pages live in benchmarks/fixtures/ (see capture_fixtures.py); synthetic
+pages from html_pages.py scale the fixtures table to thousands of rows.
+
+Usage:
+    python benchmarks/bench_parse.py [--iterations 50] [--rows 7,200,2000]
+    python benchmarks/bench_parse.py --check                   # exit 1 on regression
+    python benchmarks/bench_parse.py --save-baseline           # record a new baseline after an intended change
+    python benchmarks/bench_parse.py --check --rows 200,2000,5000 --tolerance 0.3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from scraper_radgona import (
+    BASE_URL, LEAGUES, parse_score, parse_slovene_date_from_header,
+    extract_round_options_and_current, _parse_matches_from_soup, make_soup
+)
+from benchmarks.html_pages import build_round_page, round_url_path
+from benchmarks.capture_fixtures import fixture_path
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+SCORE_SAMPLES = ['3 - 1', '0 - 0', '12 - 4', '3-1', ' 2 -  2 ', 'N/P', '_ - _', 'preloženo',
+                 'Preloženo', 'odpovedano', '', 'abc']
+DATE_SAMPLES = ['Sobota, 15.11.2025', 'Nedelja, 01.06.2025', 'Petek, 31.12.2024',
+                'Datum ni določen', 'N/A', '32.13.2025']
+
+
+def parse_page(soup, url):
+    rounds, current = extract_round_options_and_current(soup, url)
+    matches = _parse_matches_from_soup(soup, current['name'], current['url'])
+    return rounds, current, matches
+
+
+def parse_pipeline(content, url):
+    """What the scraper does for every fetched page"""
+    return parse_page(make_soup(content), url)
+
+
+# --- Full tree against the fast path ---
+def full_parse(content, parser):
+    return BeautifulSoup(content, parser)
+
+
+def fast_parse(content, parser):
+    os.environ['SCRAPER_HTML_PARSER'] = parser
+    return make_soup(content)
+
+
+def time_it(fn, content, parser, url, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = parse_page(fn(content, parser), url)
+    return (time.perf_counter() - start) / iterations, result
+
+
+def compare_parsers(row_counts, iterations):
+    parsers = ['html.parser'] + (['lxml'] if LXML_AVAILABLE else [])
+    url = BASE_URL + round_url_path('liga_a', 13)
+    failures = 0
+
+    print(f"{'rows':>6} {'parser':<12} {'full ms':>10} {'fast ms':>10} {'speedup':>8}  identical")
+    for rows in row_counts:
+        content = build_round_page('liga_a', 13, match_rows=rows)
+        page_iterations = max(3, iterations // max(1, rows // 50))
+        baseline_result = None
+        for parser in parsers:
+            full_time, full_result = time_it(full_parse, content, parser, url, page_iterations)
+            fast_time, fast_result = time_it(fast_parse, content, parser, url, page_iterations)
+            # html.parser's full tree is the reference output for every configuration
+            baseline_result = baseline_result or full_result
+            identical = fast_result == baseline_result and full_result == baseline_result
+            failures += 0 if identical else 1
+            print(f"{rows:>6} {parser:<12} {full_time * 1000:>10.2f} {fast_time * 1000:>10.2f} "
+                  f"{full_time / fast_time:>7.1f}x  {'yes' if identical else 'NO'}")
+
+    if failures:
+        print(f"\n{failures} parser configuration(s) produced different output than the full parse")
+        sys.exit(1)
+
+
+# --- Regression suite against baseline.json ---
+def calibrate():
+    """Fixed pure-Python workload; baseline timings are scaled by it so they survive a change of machine"""
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        sum(i * i for i in range(200000))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def time_call(fn, repeat, number):
+    """Best time per call in microseconds (min over repeats filters scheduler noise)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def peak_memory_kb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def load_pages(row_counts):
+    """[(case name, content bytes, url)] - captured fixtures for both leagues, then synthetic pages"""
+    pages = []
+    for league in LEAGUES:
+        path = fixture_path(league['id'])
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                pages.append((f"fixture.{league['id']}", f.read(), league['url']))
+        else:
+            print(f"[WARNING] Missing fixture {path} - run benchmarks/capture_fixtures.py")
+    for rows in row_counts:
+        pages.append((f"synthetic.rows_{rows}", build_round_page('liga_a', 13, match_rows=rows, seed=2025),
+                      BASE_URL + round_url_path('liga_a', 13)))
+    return pages
+
+
+def run_suite(row_counts, repeat):
+    results = {}
+
+    def record(name, per_call_us, rows=None, peak_kb=None):
+        results[name] = {'per_call_us': round(per_call_us, 3)}
+        if rows:
+            results[name]['rows'] = rows
+            results[name]['per_row_us'] = round(per_call_us / rows, 3)
+        if peak_kb is not None:
+            results[name]['peak_kb'] = round(peak_kb, 1)
+
+    record('micro.parse_score', time_call(lambda: [parse_score(s) for s in SCORE_SAMPLES], repeat, 2000)
+           / len(SCORE_SAMPLES))
+    record('micro.parse_slovene_date_from_header',
+           time_call(lambda: [parse_slovene_date_from_header(s) for s in DATE_SAMPLES], repeat, 2000)
+           / len(DATE_SAMPLES))
+
+    for case, content, url in load_pages(row_counts):
+        soup = make_soup(content)
+        _, _, matches = parse_pipeline(content, url)
+        match_rows = max(1, len(matches))
+        number = max(1, 2000 // (match_rows + 20))
+        record(f"{case}.extract_round_options",
+               time_call(lambda: extract_round_options_and_current(soup, url), repeat, 50))
+        record(f"{case}.parse_matches",
+               time_call(lambda: _parse_matches_from_soup(soup, 'bench', url), repeat, number), rows=match_rows)
+        record(f"{case}.page", time_call(lambda: parse_pipeline(content, url), repeat, number),
+               rows=match_rows, peak_kb=peak_memory_kb(lambda: parse_pipeline(content, url)))
+    return results
+
+
+def compare(results, baseline, scale, tolerance, memory_tolerance):
+    """Return the list of regressions; time limits are scaled by the calibration ratio"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        time_limit = previous['per_call_us'] * scale * (1 + tolerance)
+        if current['per_call_us'] > time_limit:
+            regressions.append(f"{name}: {current['per_call_us']:.1f} us > {time_limit:.1f} us allowed")
+        if 'peak_kb' in previous and 'peak_kb' in current:
+            memory_limit = previous['peak_kb'] * (1 + memory_tolerance)
+            if current['peak_kb'] > memory_limit:
+                regressions.append(f"{name}: peak {current['peak_kb']:.0f} KiB > {memory_limit:.0f} KiB allowed")
+    return regressions
+
+
+def print_results(results, baseline, scale):
+    print(f"{'case':<50} {'per call':>12} {'per row':>10} {'peak KiB':>9} {'vs base':>8}")
+    for name, r in results.items():
+        per_call = f"{r['per_call_us'] / 1000:.2f} ms" if r['per_call_us'] >= 1000 else f"{r['per_call_us']:.2f} us"
+        per_row = f"{r['per_row_us']:.1f} us" if 'per_row_us' in r else ''
+        peak = f"{r['peak_kb']:.0f}" if 'peak_kb' in r else ''
+        previous = baseline.get(name)
+        ratio = f"{r['per_call_us'] / (previous['per_call_us'] * scale):.2f}x" if previous else 'new'
+        print(f"{name:<50} {per_call:>12} {per_row:>10} {peak:>9} {ratio:>8}")
+
+
+def check_baseline(row_counts, args):
+    calibration_ms = calibrate()
+    results = run_suite(row_counts, args.repeat)
+
+    baseline = {}
+    scale = 1.0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        baseline = stored['results']
+        scale = calibration_ms / stored['calibration_ms']
+
+    print_results(results, baseline, scale)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'calibration_ms': round(calibration_ms, 3), 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, scale, args.tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\nNo regressions (machine speed factor {scale:.2f})" if baseline else "\nNo baseline to compare against")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', default=None,
+                            help='comma separated fixtures table sizes (default 7,200,2000; 200,2000 with --check)')
+    arg_parser.add_argument('--iterations', type=int, default=50)
+    arg_parser.add_argument('--check', action='store_true', help='run the regression suite against the baseline')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--baseline', default=BASELINE_PATH)
+    arg_parser.add_argument('--save-baseline', action='store_true')
+    arg_parser.add_argument('--tolerance', type=float, default=0.30, help='allowed slowdown (0.30 = 30%%)')
+    arg_parser.add_argument('--memory-tolerance', type=float, default=0.15, help='allowed peak memory growth')
+    args = arg_parser.parse_args()
+
+    suite = args.check or args.save_baseline
+    rows = args.rows or ('200,2000' if suite else '7,200,2000')
+    row_counts = [int(r) for r in rows.split(',') if r]
+    if suite:
+        check_baseline(row_counts, args)
+    else:
+        compare_parsers(row_counts, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
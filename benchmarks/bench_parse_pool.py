@@ -0,0 +1,84 @@
+"""
+Parse throughput of the process pool stage against in-thread parsing, with fetch threads
+handing pages over the way fetch_round does.
+
+Usage:
+    python benchmarks/bench_parse_pool.py                       # 0 (in-thread), 2, 4, ... up to the CPU count
+    python benchmarks/bench_parse_pool.py --processes 0,2,4,8 --pages 208 --threads 8 --rows 50
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper_radgona
+from scraper_radgona import parse_page, shutdown_parse_pool
+from benchmarks.html_pages import build_round_page, round_url_path
+
+
+def build_pages(count, rows):
+    """Round pages of both leagues: [(content, url, round name)]"""
+    pages = []
+    for i in range(count):
+        league_id = 'liga_a' if i % 2 == 0 else 'liga_b'
+        round_no = i // 2 % 26 + 1
+        pages.append((build_round_page(league_id, round_no, match_rows=rows, seed=i),
+                      scraper_radgona.BASE_URL + round_url_path(league_id, round_no), f"{round_no}. krog"))
+    return pages
+
+
+def run(pages, processes, threads):
+    """Seconds to parse every page through parse_page() from `threads` fetch threads"""
+    os.environ['SCRAPER_PARSE_PROCESSES'] = str(processes)
+    shutdown_parse_pool()
+    # Start the workers before timing - spawning is a one-off cost per scraper process
+    with ThreadPoolExecutor(max_workers=max(1, processes)) as warmup:
+        list(warmup.map(lambda page: parse_page(*page), pages[:max(1, processes)]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda page: parse_page(*page), pages))
+    elapsed = time.perf_counter() - start
+    shutdown_parse_pool()
+    return elapsed, results
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_levels = [0] + [n for n in (2, 4, 8, 16, 32) if n <= cpu_count]
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--processes', default=','.join(map(str, default_levels)),
+                            help='comma separated pool sizes, 0 = parse in the fetch threads')
+    arg_parser.add_argument('--pages', type=int, default=104, help='round pages to parse (4 seasons = 104)')
+    arg_parser.add_argument('--rows', type=int, default=None, help='match rows per page (default: one round)')
+    arg_parser.add_argument('--threads', type=int, default=max(3, cpu_count), help='fetch threads handing over pages')
+    args = arg_parser.parse_args()
+
+    pages = build_pages(args.pages, args.rows)
+    levels = [int(p) for p in args.processes.split(',') if p]
+    print(f"{len(pages)} pages, {args.threads} fetch threads, {cpu_count} CPU cores")
+    print(f"{'processes':>10} {'seconds':>9} {'pages/s':>9} {'speedup':>8}  identical")
+
+    reference = None
+    baseline = None
+    failures = 0
+    for processes in levels:
+        elapsed, results = run(pages, processes, args.threads)
+        reference = reference or results
+        baseline = baseline or elapsed
+        identical = results == reference
+        failures += 0 if identical else 1
+        label = 'in-thread' if processes < 2 else str(processes)
+        print(f"{label:>10} {elapsed:>9.2f} {len(pages) / elapsed:>9.1f} {baseline / elapsed:>7.2f}x  "
+              f"{'yes' if identical else 'NO'}")
+
+    if failures:
+        print(f"\n{failures} pool size(s) produced different matches than in-thread parsing")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Full-season scrape against the local fake upstream: wall time, retries, limiter
+backoff and upstream concurrency under injected faults. No database writes.
+
+Usage:
+    python benchmarks/bench_upstream.py --engine threads --latency 150 --jitter 100
+    python benchmarks/bench_upstream.py --engine asyncio --error-rate 503=0.05 --challenge-rate 0.02 --retry-after 1
+    SCRAPER_RATE_START_RPS=4 SCRAPER_RATE_MAX_RPS=20 python benchmarks/bench_upstream.py --truncate-rate 0.05
+
+Scraper settings (SCRAPER_MAX_WORKERS, SCRAPER_RATE_*, ...) are read from the environment as usual;
+the response cache, session file and limiter state go to a throwaway directory.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fake_upstream
+
+
+def counter_total(counter, **match):
+    """Sum a metrics.Counter over the label sets that match the given labels"""
+    with counter._lock:
+        return sum(value for key, value in counter._values.items()
+                   if all(dict(zip(counter.labelnames, key)).get(k) == v for k, v in match.items()))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--engine', choices=['threads', 'asyncio'], default='threads')
+    arg_parser.add_argument('--league', choices=list(fake_upstream.LEAGUE_PATHS), action='append',
+                            help='league(s) to scrape (default: all)')
+    arg_parser.add_argument('--archive', help='scraper HTML archive to replay instead of synthetic rounds')
+    arg_parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    fake_upstream.add_fault_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    fake_upstream.update_faults(fake_upstream.faults_from_args(args))
+    server = fake_upstream.serve(0, archive_dir=args.archive)
+
+    # The scraper reads these at import time
+    state_dir = tempfile.mkdtemp(prefix='bench_upstream_')
+    os.environ['SCRAPER_BASE_URL'] = f"http://127.0.0.1:{server.server_port}"
+    os.environ['SCRAPER_CACHE_DIR'] = state_dir
+    os.environ['SCRAPER_HTML_ARCHIVE'] = 'false'
+    import metrics
+    import scraper_radgona
+
+    report = {'engine': args.engine, 'faults': fake_upstream.update_faults({}), 'leagues': []}
+    started = time.perf_counter()
+    for league in scraper_radgona.LEAGUES:
+        if args.league and league['id'] not in args.league:
+            continue
+        league_start = time.perf_counter()
+        page_matches, all_matches, rounds, current = scraper_radgona.fetch_lmn_radgona_data(
+            league['url'], fetch_all_rounds_data=True, fetch_engine=args.engine)
+        rounds_with_matches = {m['round_url'] for m in all_matches or []}
+        report['leagues'].append({
+            'id': league['id'],
+            'seconds': round(time.perf_counter() - league_start, 2),
+            'current_round': current['name'],
+            'rounds_available': len(rounds),
+            'rounds_with_matches': len(rounds_with_matches),
+            'matches': len(all_matches or page_matches),
+        })
+    report['seconds'] = round(time.perf_counter() - started, 2)
+    report['upstream'] = fake_upstream.snapshot_stats()
+    report['scraper'] = {
+        'attempts': counter_total(metrics.UPSTREAM_RESPONSES),
+        'retries': counter_total(metrics.UPSTREAM_RETRIES),
+        'failed_attempts': counter_total(metrics.UPSTREAM_RESPONSES, status='error'),
+        'challenges_seen': counter_total(metrics.CLOUDFLARE_CHALLENGES),
+        'limiter_backoffs': counter_total(metrics.UPSTREAM_THROTTLED),
+        'rate_limit': scraper_radgona.get_rate_limit_status(),
+    }
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"\nengine={args.engine} faults={json.dumps(report['faults'])}")
+    print(f"{'league':<8} {'seconds':>8} {'rounds':>8} {'parsed':>8} {'matches':>8}")
+    for league in report['leagues']:
+        print(f"{league['id']:<8} {league['seconds']:>8.2f} {league['rounds_available']:>8} "
+              f"{league['rounds_with_matches']:>8} {league['matches']:>8}")
+    upstream, scraper = report['upstream'], report['scraper']
+    print(f"\ntotal {report['seconds']:.2f}s | upstream: {upstream['requests']} requests, "
+          f"{upstream['requests_per_second']:.2f} req/s, peak concurrency {upstream['max_inflight']}, "
+          f"statuses {upstream['statuses']}, injected {upstream['faults']}")
+    print(f"scraper: {scraper['attempts']} attempts, {scraper['retries']} retries, "
+          f"{scraper['failed_attempts']} without response, {scraper['challenges_seen']} challenges, "
+          f"{scraper['limiter_backoffs']} limiter backoffs, final rate "
+          f"{scraper['rate_limit']['rate_per_second']} req/s")
+
+
+if __name__ == '__main__':
+    main()
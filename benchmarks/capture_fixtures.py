@@ -0,0 +1,48 @@
+"""
+Capture the current results page of every league into benchmarks/fixtures/.
+
+Usage:
+    python benchmarks/capture_fixtures.py              # live pages (warmed scraper session)
+    python benchmarks/capture_fixtures.py --synthetic  # offline stand-ins from html_pages
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper_radgona import LEAGUES, checkout_scraper_session, release_scraper_session
+from benchmarks.html_pages import FIXTURES_DIR, build_round_page, fixture_path
+
+
+def capture_live():
+    session = checkout_scraper_session()
+    try:
+        for league in LEAGUES:
+            response = session.get(league['url'], timeout=20)
+            response.raise_for_status()
+            with open(fixture_path(league['id']), 'wb') as f:
+                f.write(response.content)
+            print(f"{league['id']}: {len(response.content)} bytes from {league['url']}")
+    finally:
+        release_scraper_session(session)
+
+
+def capture_synthetic():
+    for league in LEAGUES:
+        content = build_round_page(league['id'], round_no=13, seed=2025)
+        with open(fixture_path(league['id']), 'wb') as f:
+            f.write(content)
+        print(f"{league['id']}: {len(content)} bytes (synthetic)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--synthetic', action='store_true', help='build pages locally instead of fetching')
+    args = arg_parser.parse_args()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    capture_synthetic() if args.synthetic else capture_live()
+
+
+if __name__ == '__main__':
+    main()
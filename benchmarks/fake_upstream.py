@@ -0,0 +1,314 @@
+"""
+Local stand-in for www.lmn-radgona.si with fault injection, for load and resilience
+testing of the scraper without touching (and getting banned by) the real site.
+
+Usage:
+    python benchmarks/fake_upstream.py --port 8765 --latency 200 --jitter 100 --error-rate 503=0.1
+    SCRAPER_BASE_URL=http://127.0.0.1:8765 python scraper_radgona.py --test-now
+
+Pages come from, in order: the scraper's HTML archive (--archive, latest snapshot per URL),
+the captured fixtures (current round of each league) and synthetic html_pages rounds.
+
+While running:
+    GET /__faults                                   current fault settings (JSON)
+    GET /__faults?latency_ms=500&challenge_rate=0.2 change them (error_403=0.1, retry_after=5, ...)
+    GET /__stats[?reset=1]                          requests, statuses, injected faults, peak concurrency
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Deliberately no scraper import here - it reads SCRAPER_BASE_URL when first imported
+from benchmarks.html_pages import LEAGUE_PATHS, build_round_page, fixture_path
+
+ERROR_STATUSES = (403, 415, 429, 503)
+CURRENT_ROUND = 13
+
+# Body the site serves while Cloudflare verifies the browser
+CHALLENGE_PAGE = (
+    '<!DOCTYPE html><html lang="en-US"><head><title>Just a moment...</title></head><body>'
+    '<h1>One moment, please...</h1><p>Please wait while your request is being verified...</p>'
+    '<form id="challenge-form" action="/?__cf_chl_f_tk=fake" method="POST"></form></body></html>'
+).encode('utf-8')
+
+HOMEPAGE = (
+    '<!DOCTYPE html><html lang="sl-si"><head><meta charset="utf-8"/><title>LMN Radgona</title></head><body>'
+    + ''.join(f'<p><a href="{path}">{league_id}</a></p>' for league_id, path in LEAGUE_PATHS.items())
+    + '</body></html>'
+).encode('utf-8')
+
+FAULTS = {
+    'latency_ms': 0,
+    'jitter_ms': 0,
+    'error_rates': {status: 0.0 for status in ERROR_STATUSES},
+    'challenge_rate': 0.0,
+    'truncate_rate': 0.0,
+    'retry_after': None,
+}
+_faults_lock = threading.Lock()
+_rng = random.Random()
+
+_stats_lock = threading.Lock()
+
+
+def _empty_stats():
+    return {'requests': 0, 'statuses': {}, 'faults': {}, 'inflight': 0, 'max_inflight': 0,
+            'started': time.monotonic(), 'last_request': None}
+
+
+STATS = _empty_stats()
+RECORDED = {}   # path -> archived snapshot file
+
+
+def load_archive(archive_dir):
+    """Index the latest snapshot of every URL in a scraper HTML archive by its path"""
+    if not os.path.isdir(archive_dir):
+        return 0
+    for entry in os.listdir(archive_dir):
+        url_dir = os.path.join(archive_dir, entry)
+        url_file = os.path.join(url_dir, 'url.txt')
+        if not os.path.exists(url_file):
+            continue
+        with open(url_file, 'r', encoding='utf-8') as f:
+            path = urlparse(f.read().strip()).path
+        snapshots = sorted(name for name in os.listdir(url_dir) if name.endswith('.html.gz'))
+        if snapshots:
+            RECORDED[path.rstrip('/')] = os.path.join(url_dir, snapshots[-1])
+    return len(RECORDED)
+
+
+def page_for_path(path):
+    """Body for a request path, or None for an unknown page"""
+    path = path.rstrip('/')
+    if not path:
+        return HOMEPAGE
+    if path in RECORDED:
+        with gzip.open(RECORDED[path], 'rb') as f:
+            return f.read()
+    for league_id, league_path in LEAGUE_PATHS.items():
+        if path == league_path:
+            if os.path.exists(fixture_path(league_id)):
+                with open(fixture_path(league_id), 'rb') as f:
+                    return f.read()
+            return build_round_page(league_id, CURRENT_ROUND, seed=CURRENT_ROUND)
+        if path.startswith(league_path + '/'):
+            # Round pages: the first numeric segment after the league path is the round number
+            round_no = next((int(part) for part in path[len(league_path):].split('/') if part.isdigit()), None)
+            if round_no:
+                return build_round_page(league_id, round_no, seed=round_no)
+    return None
+
+
+def update_faults(params):
+    """Apply /__faults query parameters (or CLI values) to FAULTS"""
+    with _faults_lock:
+        for key in ('latency_ms', 'jitter_ms'):
+            if key in params:
+                FAULTS[key] = float(params[key])
+        for key in ('challenge_rate', 'truncate_rate'):
+            if key in params:
+                FAULTS[key] = float(params[key])
+        if 'retry_after' in params:
+            FAULTS['retry_after'] = params['retry_after'] or None
+        for status in ERROR_STATUSES:
+            if f'error_{status}' in params:
+                FAULTS['error_rates'][status] = float(params[f'error_{status}'])
+        if 'seed' in params:
+            _rng.seed(params['seed'])
+        return json.loads(json.dumps(FAULTS))
+
+
+def _pick_fault():
+    """(delay, fault) - fault is None, ('error', status), 'challenge' or 'truncate'; one draw so the rates add up"""
+    with _faults_lock:
+        draw = _rng.random()
+        delay = (FAULTS['latency_ms'] + _rng.random() * FAULTS['jitter_ms']) / 1000
+        for status, rate in FAULTS['error_rates'].items():
+            if draw < rate:
+                return delay, ('error', status)
+            draw -= rate
+        if draw < FAULTS['challenge_rate']:
+            return delay, 'challenge'
+        draw -= FAULTS['challenge_rate']
+        if draw < FAULTS['truncate_rate']:
+            return delay, 'truncate'
+        return delay, None
+
+
+def snapshot_stats(reset=False):
+    global STATS
+    with _stats_lock:
+        elapsed = max(1e-9, (STATS['last_request'] or time.monotonic()) - STATS['started'])
+        stats = {
+            'requests': STATS['requests'],
+            'statuses': dict(STATS['statuses']),
+            'faults': dict(STATS['faults']),
+            'max_inflight': STATS['max_inflight'],
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(STATS['requests'] / elapsed, 3) if STATS['requests'] else 0.0,
+        }
+        if reset:
+            STATS = _empty_stats()
+    return stats
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self._count('statuses', str(status))
+
+    def _count(self, bucket, key):
+        with _stats_lock:
+            STATS[bucket][key] = STATS[bucket].get(key, 0) + 1
+
+    def _send_json(self, data):
+        body = json.dumps(data, indent=2).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed_url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed_url.query).items()}
+        if parsed_url.path == '/__faults':
+            return self._send_json(update_faults(params))
+        if parsed_url.path == '/__stats':
+            return self._send_json(snapshot_stats(reset=params.get('reset') == '1'))
+
+        with _stats_lock:
+            STATS['requests'] += 1
+            STATS['inflight'] += 1
+            STATS['max_inflight'] = max(STATS['max_inflight'], STATS['inflight'])
+            STATS['last_request'] = time.monotonic()
+        try:
+            self._serve_page(parsed_url.path)
+        finally:
+            with _stats_lock:
+                STATS['inflight'] -= 1
+
+    def _serve_page(self, path):
+        delay, fault = _pick_fault()
+        if delay:
+            time.sleep(delay)
+
+        if isinstance(fault, tuple):
+            self._count('faults', f'http_{fault[1]}')
+            headers = {'Content-Type': 'text/html; charset=utf-8'}
+            if FAULTS['retry_after']:
+                headers['Retry-After'] = str(FAULTS['retry_after'])
+            return self._send(fault[1], f'<html><body>Error {fault[1]}</body></html>'.encode('utf-8'), headers)
+        if fault == 'challenge':
+            self._count('faults', 'challenge')
+            return self._send(200, CHALLENGE_PAGE, {'Content-Type': 'text/html; charset=UTF-8',
+                                                   'Set-Cookie': '__cf_bm=fake; Path=/; HttpOnly'})
+
+        body = page_for_path(path)
+        if body is None:
+            return self._send(404, b'Not found', {'Content-Type': 'text/plain'})
+
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if fault is None and self.headers.get('If-None-Match') == etag:
+            return self._send(304, headers={'ETag': etag})
+        headers = {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}
+
+        if fault == 'truncate':
+            # Promise the whole page, send part of it and drop the connection
+            self._count('faults', 'truncate')
+            self._count('statuses', '200')
+            self.send_response(200)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:_rng.randint(1, max(1, len(body) // 2))])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self._send(200, body, headers)
+
+
+def serve(port=0, host='127.0.0.1', archive_dir=None):
+    """Start the fake upstream on a daemon thread; returns the server (server.server_port for port=0)"""
+    if archive_dir:
+        load_archive(archive_dir)
+    server = ThreadingHTTPServer((host, port), FakeUpstreamHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-upstream', daemon=True).start()
+    return server
+
+
+def parse_error_rates(values):
+    """['503=0.1', '403=0.05'] -> {'error_503': '0.1', 'error_403': '0.05'}"""
+    params = {}
+    for value in values or []:
+        status, rate = value.split('=', 1)
+        if int(status) not in ERROR_STATUSES:
+            raise argparse.ArgumentTypeError(f"error status must be one of {ERROR_STATUSES}")
+        params[f'error_{int(status)}'] = rate
+    return params
+
+
+def add_fault_arguments(arg_parser):
+    arg_parser.add_argument('--latency', type=float, default=0, help='added latency per request (ms)')
+    arg_parser.add_argument('--jitter', type=float, default=0, help='random extra latency up to this many ms')
+    arg_parser.add_argument('--error-rate', action='append', metavar='STATUS=RATE',
+                            help='share of requests answered with 403/415/429/503 (repeatable)')
+    arg_parser.add_argument('--challenge-rate', type=float, default=0, help='share of Cloudflare challenge pages')
+    arg_parser.add_argument('--truncate-rate', type=float, default=0, help='share of bodies cut off mid-transfer')
+    arg_parser.add_argument('--retry-after', help='Retry-After header sent with error responses')
+    arg_parser.add_argument('--seed', help='seed for reproducible fault sequences')
+
+
+def faults_from_args(args):
+    params = {'latency_ms': args.latency, 'jitter_ms': args.jitter, 'challenge_rate': args.challenge_rate,
+              'truncate_rate': args.truncate_rate, 'retry_after': args.retry_after or ''}
+    params.update(parse_error_rates(args.error_rate))
+    if args.seed is not None:
+        params['seed'] = args.seed
+    return params
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--archive', help='scraper HTML archive to replay (e.g. .scraper_archive)')
+    add_fault_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    faults = update_faults(faults_from_args(args))
+    server = serve(args.port, args.host, args.archive)
+    print(f"Fake upstream on http://{args.host}:{server.server_port} "
+          f"({len(RECORDED)} recorded pages, faults: {json.dumps(faults)})")
+    print(f"Point the scraper at it: SCRAPER_BASE_URL=http://{args.host}:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n{json.dumps(snapshot_stats(), indent=2)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Synthetic LMN Radgona round pages for parser benchmarks.
+
+The markup mirrors the live Joomla/JoomSport page: a table based layout with
+menus and modules around table.fixtures-results and select#select-round.
+"""
+import os
+import random
+
+TEAMS = {
+    'liga_a': [
+        'Spodnja Ščavnica', 'Tiha voda', 'Lokavec', 'Podgrad', 'Plitvica',
+        'Negova', 'Očeslavci', 'Stari hrast', 'Baren', 'Radenska',
+        'Kapela', 'Ivanjševska slatina', 'Dinamo Radgona', 'Lešane'
+    ],
+    'liga_b': [
+        'Ihova', 'Grabonoš', 'Police', 'Bumefekt', 'Mahovci', 'Šenekar',
+        'Stavešinci', 'Segovci', 'Vrabel', 'Zoro', 'Hrastko', 'Porkys', 'Črešnjevci'
+    ]
+}
+
+LEAGUE_PATHS = {
+    'liga_a': '/index.php/ct-menu-item-7/razpored-liga-a',
+    'liga_b': '/index.php/2017-08-11-13-54-06/razpored-liga-b'
+}
+
+DAYS = ['Petek', 'Sobota', 'Nedelja']
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_path(league_id):
+    """Captured current-round page of a league (see capture_fixtures.py)"""
+    return os.path.join(FIXTURES_DIR, f"{league_id}.html")
+
+
+def round_url_path(league_id, round_no):
+    return f"{LEAGUE_PATHS[league_id]}/{round_no}/1/0/0"
+
+
+def _menu(items):
+    links = ''.join(
+        f'<li class="item-{i}"><a href="/index.php/menu-{i}"><span>Meni {i}</span></a></li>'
+        for i in range(items))
+    return f'<div class="moduletable_menu"><ul class="menu">{links}</ul></div>'
+
+
+def _modules(count):
+    return ''.join(
+        f'<div class="moduletable"><h3>Modul {i}</h3><table class="mod-table"><tr><td>'
+        f'<p>Obvestilo {i} <a href="/index.php/novica-{i}">več</a></p></td></tr></table></div>'
+        for i in range(count))
+
+
+def _match_row(row_idx, home, away, score, venue, time_str):
+    css = 'sectiontableentry1' if row_idx % 2 == 0 else 'sectiontableentry2'
+    if score is None:
+        score_html = '<a href="#"><span class="score">_ - _</span></a>'
+    else:
+        score_html = f'<a href="/index.php/tekma/{row_idx}"><span class="score">{score[0]}&nbsp;-&nbsp;{score[1]}</span></a>'
+    return (
+        f'<tr class="{css}">'
+        f'<td class="match_no">{row_idx + 1}</td>'
+        f'<td class="match_time"><div class="time-container"><span>{time_str}</span></div></td>'
+        f'<td class="team_logo"><img src="/images/logo-{row_idx}.png" alt=""/></td>'
+        f'<td class="home_team"><a href="/index.php/ekipa/{row_idx}"><span>{home}</span></a></td>'
+        f'<td class="sep"></td>'
+        f'<td class="score_cell">{score_html}</td>'
+        f'<td class="sep"></td>'
+        f'<td class="away_team"><a href="/index.php/ekipa/{row_idx + 100}"><span>{away}</span></a></td>'
+        f'<td class="team_logo"><img src="/images/logo-{row_idx + 100}.png" alt=""/></td>'
+        f'<td class="venue"><a href="/index.php/igrisce/{row_idx}">{venue}</a>'
+        f'<table class="venue-info"><tr><td>Igrišče</td></tr></table></td>'
+        f'</tr>'
+    )
+
+
+def build_round_page(league_id='liga_a', round_no=13, total_rounds=26, match_rows=None,
+                     played=True, seed=None, menu_items=120, modules=15):
+    """Return a round page as UTF-8 bytes. match_rows scales the fixtures table (default: one round)."""
+    rng = random.Random(seed if seed is not None else round_no)
+    teams = TEAMS[league_id]
+    if match_rows is None:
+        match_rows = len(teams) // 2
+
+    options = []
+    for r in range(1, total_rounds + 1):
+        selected = ' selected="selected"' if r == round_no else ''
+        options.append(f'<option value="{round_url_path(league_id, r)}"{selected}>{r}. krog</option>')
+
+    rows = []
+    per_day = max(1, match_rows // len(DAYS))
+    for i in range(match_rows):
+        if i % per_day == 0:
+            day = DAYS[(i // per_day) % len(DAYS)]
+            rows.append(f'<tr class="sectiontableheader"><th colspan="10">{day}, '
+                        f'{(round_no % 28) + 1:02d}.11.2025</th></tr>')
+        home, away = rng.sample(teams, 2)
+        score = (rng.randint(0, 7), rng.randint(0, 7)) if played else None
+        rows.append(_match_row(i, home, away, score, f'Igrišče {home}', f'{17 + i % 4}:00'))
+
+    html = (
+        '<!DOCTYPE html><html lang="sl-si"><head><meta charset="utf-8"/>'
+        '<title>LMN Radgona - Razpored</title>'
+        + ''.join(f'<link rel="stylesheet" href="/templates/css/style-{i}.css"/>' for i in range(12))
+        + ''.join(f'<script src="/media/js/lib-{i}.js"></script>' for i in range(10))
+        + '<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>'
+        '</head><body><div id="wrapper"><table class="layout" width="100%"><tr>'
+        f'<td class="left">{_menu(menu_items)}{_modules(modules)}</td>'
+        '<td class="main"><table class="contentpaneopen"><tr>'
+        f'<td class="contentheading" width="100%">Rezultati kroga - {round_no}. krog</td>'
+        '</tr></table>'
+        '<div id="joomsport-container"><div class="selection">'
+        f'<select id="select-round" name="select-round">{"".join(options)}</select></div>'
+        f'<table class="fixtures-results">{"".join(rows)}</table></div></td>'
+        f'<td class="right">{_modules(modules)}</td></tr></table>'
+        '<div id="footer"><p>&copy; LMN Radgona</p></div></div></body></html>'
+    )
+    return html.encode('utf-8')
@@ -1,11 +1,18 @@
 import os
+import re
 import json
+import threading
+import time
+import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 import psycopg2
 from psycopg2 import pool
+import psycopg2.extras
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 from contextlib import contextmanager
+import metrics
 
 load_dotenv()
 
@@ -13,17 +20,119 @@ load_dotenv()
 CACHE_DURATION_ROUNDS = timedelta(days=7)   # Rounds rarely change - cache for a week
 CACHE_DURATION_MATCHES = timedelta(hours=24)  # Extended to 24 hours for better round navigation  
 CACHE_DURATION_LEADERBOARD = timedelta(hours=6)  # Cache leaderboard for 6 hours for speed
+SYNC_RECENT_WINDOW = timedelta(days=14)  # Rounds played in the last two weeks can still get late results
+SYNC_STALE_AFTER = timedelta(days=7)     # Every other round is re-checked at most once a week
+
+# Score strings that count as a played match ("3 - 1"); everything else (N/P, preloženo, ...) is unplayed
+PLAYED_SCORE_PATTERN = r'^\s*\d+\s*-\s*\d+\s*$'
+PLAYED_SCORE_GOALS = re.compile(r'\s*(\d+)\s*-\s*(\d+)\s*')
 
 # --- Database connection pool ---
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 2))           # opened at start, kept open while idle
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds a checkout may wait for a free connection
+DB_POOL_PING_AFTER = 30  # idle seconds after which a connection is checked with SELECT 1 before reuse
+DB_BULK_PAGE_SIZE = 1000  # rows per INSERT statement in cache_matches_bulk
+DB_STREAM_BATCH = int(os.environ.get('DB_STREAM_BATCH', 2000))  # rows per fetch from a server-side cursor
+
+class PoolTimeoutError(pool.PoolError):
+    """No connection became free within DB_POOL_TIMEOUT"""
+
+class BoundedConnectionPool(pool.ThreadedConnectionPool):
+    """
+    Thread-safe pool that queues checkouts while all maxconn connections are in use (up to
+    `timeout` seconds) instead of failing, replaces dead connections on checkout and keeps stats.
+    """
+    def __init__(self, minconn, maxconn, *args, timeout=DB_POOL_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._stats_lock = threading.Lock()
+        self._idle_since = {}
+        self._stats = {'checkouts': 0, 'waiting': 0, 'in_use': 0, 'exhausted': 0, 'reconnects': 0,
+                       'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+        # Opens minconn connections up front - the warm-up
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._idle_since.update((id(conn), time.monotonic()) for conn in self._pool)
+
+    def getconn(self, key=None):
+        start = time.monotonic()
+        with self._stats_lock:
+            self._stats['waiting'] += 1
+        acquired = self._slots.acquire(timeout=self.timeout)
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self._stats['waiting'] -= 1
+            if not acquired:
+                self._stats['exhausted'] += 1
+        metrics.DB_POOL_WAIT_SECONDS.observe(waited)
+        if not acquired:
+            metrics.DB_POOL_EXHAUSTED.inc()
+            raise PoolTimeoutError(f"no database connection free after {self.timeout:g}s "
+                                   f"({self.maxconn} in use)")
+        try:
+            conn = self._checkout_live(key)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._stats_lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['wait_seconds_total'] += waited
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+        metrics.DB_POOL_IN_USE.inc()
+        return conn
+
+    def _checkout_live(self, key):
+        """A pooled connection that answers; dead ones (server restart, idle timeout) are replaced"""
+        for _ in range(self.maxconn + 1):
+            conn = super().getconn(key)
+            idle_since = self._idle_since.pop(id(conn), None)
+            if not conn.closed and (idle_since is None or time.monotonic() - idle_since < DB_POOL_PING_AFTER):
+                return conn
+            try:
+                if not conn.closed:
+                    with conn.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                    conn.rollback()
+                    return conn
+            except psycopg2.Error:
+                pass
+            super().putconn(conn, key, close=True)
+            with self._stats_lock:
+                self._stats['reconnects'] += 1
+        raise pool.PoolError("could not get a working database connection")
+
+    def putconn(self, conn, key=None, close=False):
+        super().putconn(conn, key, close)
+        if not conn.closed:
+            self._idle_since[id(conn)] = time.monotonic()
+        with self._stats_lock:
+            self._stats['in_use'] -= 1
+        metrics.DB_POOL_IN_USE.dec()
+        self._slots.release()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(min=self.minconn, max=self.maxconn, idle=len(self._pool), timeout_seconds=self.timeout,
+                     wait_seconds_avg=round(stats['wait_seconds_total'] / stats['checkouts'], 4)
+                     if stats['checkouts'] else 0.0)
+        stats['wait_seconds_total'] = round(stats['wait_seconds_total'], 3)
+        stats['wait_seconds_max'] = round(stats['wait_seconds_max'], 4)
+        return stats
+
 _db_pool = None
+_db_pool_lock = threading.Lock()
 
 def init_db_pool():
     global _db_pool
-    if _db_pool is None:
-        db_url = os.environ.get("DATABASE_URL")
-        if not db_url:
-            raise RuntimeError("DATABASE_URL environment variable is not set.")
-        _db_pool = pool.SimpleConnectionPool(1, 10, db_url, cursor_factory=RealDictCursor)
+    with _db_pool_lock:
+        if _db_pool is None:
+            db_url = os.environ.get("DATABASE_URL")
+            if not db_url:
+                raise RuntimeError("DATABASE_URL environment variable is not set.")
+            _db_pool = BoundedConnectionPool(DB_POOL_MIN, max(DB_POOL_MIN, DB_POOL_MAX), db_url,
+                                             cursor_factory=RealDictCursor)
 
 def get_db_connection():
     if _db_pool is None:
@@ -34,14 +143,96 @@ def release_db_connection(conn):
     if _db_pool:
         _db_pool.putconn(conn)
 
+def get_pool_stats():
+    """Connection pool counters for status pages; None before the pool exists"""
+    return _db_pool.stats() if _db_pool else None
+
+# --- Request-scoped read connection ---
+# The web app opts a request in by handing db_cursor a RequestScope (see set_request_scope_provider);
+# read helpers then share one connection and one read-only transaction instead of a checkout + COMMIT each.
+_request_scope_provider = None
+
+def set_request_scope_provider(provider):
+    """provider() returns the active RequestScope or None (the Flask app reads it from `g`)"""
+    global _request_scope_provider
+    _request_scope_provider = provider
+
+class RequestScope:
+    """One pooled connection and one read-only transaction for all read helpers of a request"""
+    def __init__(self):
+        self.conn = None
+        self.queries = 0
+
+    @contextmanager
+    def cursor(self):
+        if self.conn is None:
+            self.conn = get_db_connection()
+            # BEGIN READ ONLY on the next statement - no extra round trip
+            self.conn.readonly = True
+        cursor = self.conn.cursor()
+        try:
+            yield cursor
+            self.queries += 1
+        except Exception:
+            # An aborted transaction would fail every later read of the request
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def close(self):
+        """End the transaction (nothing to commit) and return the connection to the pool"""
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        try:
+            conn.rollback()
+            conn.readonly = None
+        finally:
+            release_db_connection(conn)
+
 @contextmanager
-def db_cursor():
+def db_cursor(read_only=False):
+    """
+    Cursor in its own transaction, committed on success. read_only=True marks helpers that only
+    SELECT - they run in autocommit (no BEGIN/COMMIT round trips), or inside a request scope
+    reuse the scope's connection and transaction.
+    """
+    scope = _request_scope_provider() if read_only and _request_scope_provider else None
+    if scope is not None:
+        with scope.cursor() as cursor:
+            yield cursor
+        return
     conn = get_db_connection()
     try:
+        if read_only:
+            conn.autocommit = True
         cursor = conn.cursor()
         yield cursor
-        conn.commit()
+        if not read_only:
+            conn.commit()
     finally:
+        if read_only and not conn.closed:
+            conn.autocommit = False
+        release_db_connection(conn)
+
+def stream_rows(query, params=None, batch_size=None):
+    """
+    Yield the rows of a large SELECT from a named (server-side) cursor, fetching batch_size rows
+    per round trip, so memory stays flat however many seasons the table holds. The connection
+    stays checked out until the generator is exhausted or closed.
+    """
+    conn = get_db_connection()
+    try:
+        conn.readonly = True
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+            cursor.itersize = batch_size or DB_STREAM_BATCH
+            cursor.execute(query, params)
+            yield from cursor
+    finally:
+        if not conn.closed:
+            conn.rollback()
+            conn.readonly = None
         release_db_connection(conn)
 
 # --- Database schema initialization ---
@@ -74,6 +265,43 @@ def init_db():
 
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_matches_league_round ON matches (league_id, round_name)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_matches_league_date ON matches (league_id, date_obj)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_matches_league_round_url ON matches (league_id, round_url)')
+
+        # When each round was last scraped successfully - written with the round's matches
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS round_freshness (
+                league_id TEXT NOT NULL,
+                round_url TEXT NOT NULL,
+                last_scraped TIMESTAMP NOT NULL,
+                PRIMARY KEY (league_id, round_url)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS team_standings (
+                league_id TEXT NOT NULL,
+                team TEXT NOT NULL,
+                played INTEGER NOT NULL DEFAULT 0,
+                won INTEGER NOT NULL DEFAULT 0,
+                drawn INTEGER NOT NULL DEFAULT 0,
+                lost INTEGER NOT NULL DEFAULT 0,
+                goals_for INTEGER NOT NULL DEFAULT 0,
+                goals_against INTEGER NOT NULL DEFAULT 0,
+                points INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (league_id, team)
+            )
+        ''')
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM team_standings) AS seeded")
+        if not cursor.fetchone()['seeded'] or _standings_have_unknown_teams(cursor):
+            _rebuild_team_standings(cursor)
+
+        # Databases from before the table: the oldest row of a round was its scrape time
+        cursor.execute('''
+            INSERT INTO round_freshness (league_id, round_url, last_scraped)
+            SELECT league_id, round_url, MIN(last_scraped) FROM matches
+            WHERE round_url IS NOT NULL AND last_scraped IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM round_freshness)
+            GROUP BY league_id, round_url
+        ''')
 
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS calculated_leaderboards (
@@ -176,6 +404,21 @@ def init_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_goals_match_result ON goals (match_result_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_match_cards_match_result ON match_cards (match_result_id)')
+
+        # Upstream circuit breaker state shared by web workers and scraper processes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS upstream_circuit (
+                name TEXT PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'closed' CHECK (state IN ('closed', 'open', 'half_open')),
+                failures INTEGER NOT NULL DEFAULT 0,
+                opened_at TIMESTAMP,
+                probe_started_at TIMESTAMP,
+                last_error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
         # Create default admin user if none exists
         try:
@@ -210,7 +453,7 @@ def init_db():
 
 # --- Leagues Meta ---
 def get_cached_rounds(league_id):
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT rounds_json, last_fetched_rounds FROM leagues_meta WHERE league_id = %s", (league_id,))
         row = cursor.fetchone()
 
@@ -234,100 +477,528 @@ def cache_rounds(league_id, rounds_data):
 
 # --- Matches ---
 def get_cached_round_matches(league_id, round_url):
-    with db_cursor() as cursor:
+    # One indexed query: the round's freshness row, joined to its matches only while fresh
+    with db_cursor(read_only=True) as cursor:
         cursor.execute('''
-            SELECT MIN(last_scraped) AS oldest_scrape_time 
-            FROM matches 
-            WHERE league_id = %s AND round_url = %s
-        ''', (league_id, round_url))
-        result = cursor.fetchone()
-
-        if result and result['oldest_scrape_time']:
-            oldest = result['oldest_scrape_time']
-            if datetime.now() - oldest < CACHE_DURATION_MATCHES:
-                cursor.execute('''
-                    SELECT * FROM matches 
-                    WHERE league_id = %s AND round_url = %s 
-                    ORDER BY date_obj, time
-                ''', (league_id, round_url))
-                rows = cursor.fetchall()
-                print(f"Using {len(rows)} cached (and fresh) matches for round URL: {round_url}")
-                return rows
-            else:
-                print(f"Match cache for {round_url} is STALE (oldest scrape: {oldest}).")
+            SELECT f.last_scraped AS round_scraped_at, m.*
+            FROM round_freshness f
+            LEFT JOIN matches m ON m.league_id = f.league_id AND m.round_url = f.round_url
+                               AND f.last_scraped > %s
+            WHERE f.league_id = %s AND f.round_url = %s
+            ORDER BY m.date_obj, m.time
+        ''', (datetime.now() - CACHE_DURATION_MATCHES, league_id, round_url))
+        rows = cursor.fetchall()
+
+    if not rows:
+        print(f"No existing cache entries or scrape times for {round_url}.")
+        return None
+    scraped_at = rows[0]['round_scraped_at']
+    if rows[0]['match_unique_id'] is None:
+        if datetime.now() - scraped_at >= CACHE_DURATION_MATCHES:
+            print(f"Match cache for {round_url} is STALE (last scrape: {scraped_at}).")
         else:
-            print(f"No existing cache entries or scrape times for {round_url}.")
-    return None
-
-def cache_matches(league_id, round_url, matches_data):
-    if not matches_data:
-        return
+            print(f"No existing cache entries for {round_url}.")
+        return None
+    for row in rows:
+        del row['round_scraped_at']
+    print(f"Using {len(rows)} cached (and fresh) matches for round URL: {round_url}")
+    return rows
+
+def make_match_unique_id(league_id, match):
+    return f"{league_id}_{match['home_team']}_{match['away_team']}_{match.get('round_name', 'unknownround')}_{match.get('date_str', 'nodate')}"
+
+def cache_matches(league_id, round_url, matches_data, prune=False):
+    """
+    Write the scraped matches of one round, touching only rows that changed.
+    Returns a change set: {'league_id', 'round_url', 'changed', 'new': [ids],
+    'matches', 'score_changes': [{match_unique_id, old_score, new_score}],
+    'rescheduled': [{match_unique_id, previous_match_unique_id, old_date, new_date, old_time, new_time}],
+    'unchanged': n, 'inserted': n, 'updated': n, 'removed': n}. A changed round also invalidates
+    the league's cached leaderboard.
+
+    prune=True also removes the round's stored rows that are no longer on the scraped page
+    (e.g. a postponed match that got a new date); rows with admin results are kept.
+    """
+    return cache_matches_bulk(league_id, {round_url: matches_data}, prune)[0]
+
+def cache_matches_bulk(league_id, matches_by_round, prune=False):
+    """
+    cache_matches for many rounds of a league in one transaction: one SELECT of the stored rows,
+    then every new, changed or stale row goes through a single multi-row INSERT ... ON CONFLICT
+    merge. Returns one change set per round, in the order given; 'inserted' and 'updated' are
+    the rows the merge reported (xmax = 0 marks an insert). With prune=True the removal of rows
+    that left a round and its standings deltas commit together with the merge.
+    """
+    change_sets = []
+    rounds = []
+    for round_url, matches_data in matches_by_round.items():
+        changes = {'league_id': league_id, 'round_url': round_url, 'changed': False, 'matches': 0,
+                   'new': [], 'score_changes': [], 'rescheduled': [], 'unchanged': 0,
+                   'inserted': 0, 'updated': 0, 'removed': 0}
+        change_sets.append(changes)
+        if matches_data:
+            scraped = {make_match_unique_id(league_id, match): match for match in matches_data}
+            changes['matches'] = len(scraped)
+            rounds.append((changes, scraped))
+    if not rounds:
+        return change_sets
     now = datetime.now()
-    with db_cursor() as cursor:
-        params = []
-        for match in matches_data:
-            date_obj_val = match['date_obj'] if match['date_obj'] else None
-            match_unique_id = f"{league_id}_{match['home_team']}_{match['away_team']}_{match.get('round_name', 'unknownround')}_{match.get('date_str', 'nodate')}"
-            params.append((
-                match_unique_id, league_id, match.get('round_name'), round_url,
-                match['date_str'], date_obj_val, match['time'],
-                match['home_team'], match['away_team'], match['score_str'],
-                match['venue'], now
-            ))
-        cursor.executemany('''
-            INSERT INTO matches 
-            (match_unique_id, league_id, round_name, round_url, date_str, date_obj, time, home_team, away_team, score_str, venue, last_scraped)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (match_unique_id) DO UPDATE SET
-                score_str = EXCLUDED.score_str,
-                last_scraped = EXCLUDED.last_scraped
-        ''', params)
-    print(f"Cached {len(matches_data)} matches for round URL: {round_url}")
 
+    with metrics.DB_WRITE_SECONDS.time(operation='cache_matches'), db_cursor() as cursor:
+        _lock_team_standings(cursor, league_id)
+        cursor.execute('''
+            SELECT match_unique_id, round_url, home_team, away_team, date_obj, time, score_str
+            FROM matches
+            WHERE match_unique_id = ANY(%s) OR (league_id = %s AND round_url = ANY(%s))
+        ''', ([match_id for _, scraped in rounds for match_id in scraped], league_id,
+              [changes['round_url'] for changes, _ in rounds]))
+        stored = {row['match_unique_id']: row for row in cursor.fetchall()}
+        stored_by_round = defaultdict(list)
+        for row in stored.values():
+            stored_by_round[row['round_url']].append(row)
+
+        staged = {}  # match_unique_id -> (row tuple, change set)
+        standings_deltas = {}
+        for changes, scraped in rounds:
+            # A new id for a pairing already stored in the round means the date moved
+            stored_by_pairing = {(row['home_team'], row['away_team']): row for row in stored_by_round[changes['round_url']]
+                                 if row['match_unique_id'] not in scraped}
+            for match_unique_id, match in scraped.items():
+                row = stored.get(match_unique_id)
+                values = (
+                    match_unique_id, league_id, match.get('round_name'), changes['round_url'],
+                    match['date_str'], match['date_obj'] if match['date_obj'] else None, match['time'],
+                    match['home_team'], match['away_team'], match['score_str'],
+                    match['venue'], now
+                )
+                if row is None:
+                    staged[match_unique_id] = (values, changes)
+                    _add_standings_delta(standings_deltas, league_id, match['home_team'], match['away_team'], match['score_str'])
+                    previous = stored_by_pairing.get((match['home_team'], match['away_team']))
+                    if previous:
+                        changes['rescheduled'].append({
+                            'match_unique_id': match_unique_id,
+                            'previous_match_unique_id': previous['match_unique_id'],
+                            'old_date': previous['date_obj'], 'new_date': match['date_obj'],
+                            'old_time': previous['time'], 'new_time': match['time']})
+                    else:
+                        changes['new'].append(match_unique_id)
+                elif row['score_str'] != match['score_str'] or row['time'] != match['time']:
+                    staged[match_unique_id] = (values, changes)
+                    if row['score_str'] != match['score_str']:
+                        _add_standings_delta(standings_deltas, league_id, row['home_team'], row['away_team'], row['score_str'], -1)
+                        _add_standings_delta(standings_deltas, league_id, match['home_team'], match['away_team'], match['score_str'])
+                        changes['score_changes'].append({'match_unique_id': match_unique_id,
+                                                         'old_score': row['score_str'], 'new_score': match['score_str']})
+                    if row['time'] != match['time']:
+                        changes['rescheduled'].append({
+                            'match_unique_id': match_unique_id, 'previous_match_unique_id': match_unique_id,
+                            'old_date': row['date_obj'], 'new_date': match['date_obj'],
+                            'old_time': row['time'], 'new_time': match['time']})
+                else:
+                    changes['unchanged'] += 1
+                    continue
+                changes['changed'] = True
+                # A later round listing the same match is compared against this write
+                stored[match_unique_id] = {'match_unique_id': match_unique_id, 'round_url': changes['round_url'],
+                                           'home_team': match['home_team'], 'away_team': match['away_team'],
+                                           'date_obj': match['date_obj'], 'time': match['time'],
+                                           'score_str': match['score_str']}
+
+        if staged:
+            written = psycopg2.extras.execute_values(cursor, '''
+                INSERT INTO matches
+                (match_unique_id, league_id, round_name, round_url, date_str, date_obj, time, home_team, away_team, score_str, venue, last_scraped)
+                VALUES %s
+                ON CONFLICT (match_unique_id) DO UPDATE SET
+                    score_str = EXCLUDED.score_str,
+                    time = EXCLUDED.time,
+                    last_scraped = EXCLUDED.last_scraped
+                RETURNING match_unique_id, (xmax = 0) AS inserted
+            ''', [values for values, _ in staged.values()], page_size=DB_BULK_PAGE_SIZE, fetch=True)
+            for row in written:
+                changes = staged[row['match_unique_id']][1]
+                changes['inserted' if row['inserted'] else 'updated'] += 1
+
+        if prune:
+            for changes, scraped in rounds:
+                removed_rows = _prune_round(cursor, league_id, changes['round_url'], list(scraped))
+                for row in removed_rows:
+                    _add_standings_delta(standings_deltas, league_id, row['home_team'], row['away_team'],
+                                         row['score_str'], -1)
+                changes['removed'] = len(removed_rows)
+                changes['changed'] = changes['changed'] or bool(removed_rows)
+        _apply_standings_deltas(cursor, league_id, standings_deltas)
+
+        # Freshness is per round, so unchanged matches are never rewritten just to mark them as checked
+        psycopg2.extras.execute_values(cursor, '''
+            INSERT INTO round_freshness (league_id, round_url, last_scraped) VALUES %s
+            ON CONFLICT (league_id, round_url) DO UPDATE SET last_scraped = EXCLUDED.last_scraped
+        ''', [(league_id, changes['round_url'], now) for changes, _ in rounds], page_size=DB_BULK_PAGE_SIZE)
+
+        if any(changes['changed'] for changes, _ in rounds):
+            _invalidate_leaderboard(cursor, league_id)
+
+    for changes, scraped in rounds:
+        for change in ('new', 'score_changes', 'rescheduled'):
+            if changes[change]:
+                metrics.DB_MATCHES_WRITTEN.inc(len(changes[change]), change=change)
+        print(f"Cached {len(scraped)} matches for round URL: {changes['round_url']} "
+              f"({len(changes['new'])} new, {len(changes['score_changes'])} score changes, "
+              f"{len(changes['rescheduled'])} rescheduled, {changes['unchanged']} unchanged"
+              + (f", {changes['removed']} removed)" if changes['removed'] else ")"))
+    return change_sets
+
+def summarize_changes(change_sets):
+    """Aggregate cache_matches() change sets into counts plus the round URLs that changed"""
+    summary = {'new': 0, 'score_changes': 0, 'rescheduled': 0, 'unchanged': 0, 'inserted': 0, 'updated': 0,
+               'removed': 0, 'changed_rounds': []}
+    for changes in change_sets:
+        for key in ('new', 'score_changes', 'rescheduled'):
+            summary[key] += len(changes[key])
+        for key in ('unchanged', 'inserted', 'updated', 'removed'):
+            summary[key] += changes.get(key, 0)
+        if changes['changed']:
+            summary['changed_rounds'].append(changes['round_url'])
+    return summary
+
+def get_round_refresh_plan(league_id, recent_window=SYNC_RECENT_WINDOW, stale_after=SYNC_STALE_AFTER):
+    """
+    Returns {round_url: [reasons]} for every round stored for the league.
+    An empty list means the round is settled and does not need to be refetched.
+    """
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute('''
+            SELECT round_url,
+                   COUNT(*) FILTER (
+                       WHERE score_str !~ %s AND (date_obj IS NULL OR date_obj <= CURRENT_DATE)
+                   ) AS unplayed_count,
+                   BOOL_OR(date_obj BETWEEN CURRENT_DATE - %s AND CURRENT_DATE) AS in_recent_window,
+                   MAX(f.last_scraped) AS last_scrape_time
+            FROM matches m
+            LEFT JOIN round_freshness f USING (league_id, round_url)
+            WHERE m.league_id = %s AND m.round_url IS NOT NULL
+            GROUP BY round_url
+        ''', (PLAYED_SCORE_PATTERN, recent_window.days, league_id))
+        rows = cursor.fetchall()
+
+    now = datetime.now()
+    plan = {}
+    for row in rows:
+        reasons = []
+        if row['unplayed_count']:
+            reasons.append(f"{row['unplayed_count']} unplayed")
+        if row['in_recent_window']:
+            reasons.append('recent')
+        if not row['last_scrape_time'] or now - row['last_scrape_time'] >= stale_after:
+            reasons.append('stale')
+        plan[row['round_url']] = reasons
+    return plan
+
+def get_unplayed_kickoffs(from_date, to_date):
+    """Unplayed matches dated between from_date and to_date (inclusive), for kickoff-aware scheduling"""
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute('''
+            SELECT league_id, round_url, round_name, date_obj, time
+            FROM matches
+            WHERE date_obj BETWEEN %s AND %s
+              AND score_str !~ %s
+              AND round_url IS NOT NULL
+            ORDER BY date_obj, time
+        ''', (from_date, to_date, PLAYED_SCORE_PATTERN))
+        return cursor.fetchall()
 
+def _prune_round(cursor, league_id, round_url, keep_ids):
+    """Delete the round's rows not in keep_ids (rows with admin results stay); returns the removed rows"""
+    cursor.execute('''
+        DELETE FROM matches m
+        WHERE m.league_id = %s AND m.round_url = %s
+          AND NOT (m.match_unique_id = ANY(%s))
+          AND NOT EXISTS (SELECT 1 FROM match_results mr WHERE mr.match_id = m.match_unique_id)
+        RETURNING m.home_team, m.away_team, m.score_str
+    ''', (league_id, round_url, keep_ids))
+    return cursor.fetchall()
 
 def get_all_matches_for_league(league_id):
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT * FROM matches WHERE league_id = %s ORDER BY date_obj, time", (league_id,))
         return cursor.fetchall()
 
+def iter_matches_for_league(league_id, batch_size=None):
+    """get_all_matches_for_league, streamed - for exports over every season"""
+    return stream_rows("SELECT * FROM matches WHERE league_id = %s ORDER BY date_obj, time",
+                       (league_id,), batch_size)
+
 # --- Leaderboard ---
-def get_cached_leaderboard(league_id):
-    with db_cursor() as cursor:
-        cursor.execute("SELECT leaderboard_data_json, last_calculated FROM calculated_leaderboards WHERE league_id = %s", (league_id,))
+def get_league_fingerprint(league_id):
+    """
+    Cheap DB-side fingerprint of a league's matches (row count, newest write, checksum of ids and
+    scores) and of its roster; it changes whenever anything a leaderboard is computed from changes.
+    """
+    roster = json.dumps([ALL_TEAMS.get(league_id), NAME_MAPPING.get(league_id)], ensure_ascii=False, sort_keys=True)
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute('''
+            SELECT COUNT(*) AS matches, MAX(last_scraped) AS last_write,
+                   COALESCE(SUM(hashtext(match_unique_id || '|' || COALESCE(score_str, ''))), 0) AS checksum,
+                   hashtext(%s) AS roster
+            FROM matches WHERE league_id = %s
+        ''', (roster, league_id))
+        row = cursor.fetchone()
+    return (f"{row['matches']}:{row['last_write'].isoformat() if row['last_write'] else '-'}:"
+            f"{row['checksum']}:{row['roster']}")
+
+def get_cached_leaderboard(league_id, source_hash=None):
+    """
+    Stored leaderboard JSON. With source_hash (get_league_fingerprint) it is returned only when it
+    was computed from exactly that data, however old; without, while younger than CACHE_DURATION_LEADERBOARD.
+    """
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute("SELECT leaderboard_data_json, last_calculated, source_data_hash FROM calculated_leaderboards WHERE league_id = %s", (league_id,))
         row = cursor.fetchone()
 
+    if source_hash is not None:
+        if row and row['leaderboard_data_json'] and row['source_data_hash'] == source_hash:
+            print(f"Using cached leaderboard for {league_id}, matches unchanged since {row['last_calculated']}")
+            return json.loads(row['leaderboard_data_json'])
+        return None
     if row and row['leaderboard_data_json'] and row['last_calculated']:
         if datetime.now() - row['last_calculated'] < CACHE_DURATION_LEADERBOARD:
             print(f"Using cached leaderboard for {league_id}, calculated at {row['last_calculated']}")
             return json.loads(row['leaderboard_data_json'])
     return None
 
-def cache_leaderboard(league_id, leaderboard_data):
+def cache_leaderboard(league_id, leaderboard_data, source_hash=None):
+    """Store the leaderboard JSON; a row already stored for the same source_hash is not rewritten"""
     with db_cursor() as cursor:
         cursor.execute('''
-            INSERT INTO calculated_leaderboards (league_id, leaderboard_data_json, last_calculated)
-            VALUES (%s, %s, %s)
+            INSERT INTO calculated_leaderboards (league_id, leaderboard_data_json, last_calculated, source_data_hash)
+            VALUES (%s, %s, %s, %s)
             ON CONFLICT (league_id) DO UPDATE SET
                 leaderboard_data_json = EXCLUDED.leaderboard_data_json,
-                last_calculated = EXCLUDED.last_calculated
-        ''', (league_id, json.dumps(leaderboard_data), datetime.now()))
-    print(f"Cached leaderboard for {league_id}")
+                last_calculated = EXCLUDED.last_calculated,
+                source_data_hash = EXCLUDED.source_data_hash
+            WHERE EXCLUDED.source_data_hash IS NULL
+               OR calculated_leaderboards.source_data_hash IS DISTINCT FROM EXCLUDED.source_data_hash
+        ''', (league_id, json.dumps(leaderboard_data), datetime.now(), source_hash))
+        written = cursor.rowcount > 0
+    print(f"Cached leaderboard for {league_id}" if written else f"Leaderboard for {league_id} already stored for this data")
+    return written
+
+def _invalidate_leaderboard(cursor, league_id):
+    # Keep the stored JSON but mark it stale so the next request recalculates it
+    cursor.execute("UPDATE calculated_leaderboards SET last_calculated = NULL WHERE league_id = %s", (league_id,))
+
+def invalidate_leaderboard(league_id):
+    with db_cursor() as cursor:
+        _invalidate_leaderboard(cursor, league_id)
 
 def clear_league_cache(league_id):
     """Clear all cached data for a specific league"""
     with db_cursor() as cursor:
+        _lock_team_standings(cursor, league_id)
         # Clear rounds cache
         cursor.execute("DELETE FROM leagues_meta WHERE league_id = %s", (league_id,))
         # Clear matches cache  
         cursor.execute("DELETE FROM matches WHERE league_id = %s", (league_id,))
+        cursor.execute("DELETE FROM round_freshness WHERE league_id = %s", (league_id,))
+        cursor.execute("DELETE FROM team_standings WHERE league_id = %s", (league_id,))
         # Clear leaderboard cache
         cursor.execute("DELETE FROM calculated_leaderboards WHERE league_id = %s", (league_id,))
     print(f"Cleared all cache for league: {league_id}")
 
+# --- Team standings ---
+# Per-team totals over matches.score_str, moved by deltas in the same transaction as every
+# write to matches, so a leaderboard is O(teams) rows instead of a recompute over the league.
+# Writers of a league are serialized by an advisory lock so their deltas never race.
+STANDINGS_COLUMNS = ('played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points')
+
+# Definirajmo vse ekipe za vsako ligo (na podlagi originalne strani)
+ALL_TEAMS = {
+    'liga_a': [
+        'Spodnja Ščavnica', 'Tiha voda', 'Lokavec', 'Podgrad', 'Plitvica',
+        'Negova', 'Očeslavci', 'Stari hrast', 'Baren', 'Radenska',
+        'Kapela', 'Ivanjševska slatina', 'Dinamo Radgona', 'Lešane'
+    ],
+    'liga_b': [
+        'Ihova', 'Grabonoš', 'Police', 'Bumefekt', 'Mahovci', 'Šenekar',
+        'Stavešinci', 'Segovci', 'Vrabel', 'Zoro', 'Hrastko', 'Porkys', 'Črešnjevci'
+    ]
+}
+
+# Mapiranje imen (scraped imena -> standardna imena)
+NAME_MAPPING = {
+    'liga_a': {
+        'Sp. Ščavnica': 'Spodnja Ščavnica',
+        'Dinamo': 'Dinamo Radgona',
+        # Dodajte druge preslikave po potrebi
+    },
+    'liga_b': {
+        # Dodajte preslikave za Liga B po potrebi
+    }
+}
+
+def _counts_toward_standings(league_id, home_team, away_team):
+    """A match counts only when both (mapped) teams are on the league's roster - leagues without one count all"""
+    roster = ALL_TEAMS.get(league_id)
+    if roster is None:
+        return True
+    mapping = NAME_MAPPING.get(league_id, {})
+    return mapping.get(home_team, home_team) in roster and mapping.get(away_team, away_team) in roster
+
+def _standings_team_names():
+    """{league_id: scraped names that count toward the standings} for the leagues with a roster"""
+    names = {}
+    for league_id, roster in ALL_TEAMS.items():
+        mapping = NAME_MAPPING.get(league_id, {})
+        names[league_id] = sorted({team for team in roster if mapping.get(team, team) in roster}
+                                  | {scraped for scraped, team in mapping.items() if team in roster})
+    return names
+
+def _lock_team_standings(cursor, league_id):
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"team_standings:{league_id}",))
+
+def _standings_team_names_json():
+    return psycopg2.extras.Json(_standings_team_names(), dumps=lambda names: json.dumps(names, ensure_ascii=False))
+
+def _score_goals(score_str):
+    """(home, away) goals of a played score - the same rule as PLAYED_SCORE_PATTERN - else None"""
+    match = PLAYED_SCORE_GOALS.fullmatch(score_str or '')
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def _add_standings_delta(deltas, league_id, home_team, away_team, score_str, sign=1):
+    goals = _score_goals(score_str)
+    if goals is None or not _counts_toward_standings(league_id, home_team, away_team):
+        return
+    for team, scored, conceded in ((home_team, goals[0], goals[1]), (away_team, goals[1], goals[0])):
+        won, drawn, lost = scored > conceded, scored == conceded, scored < conceded
+        totals = deltas.setdefault(team, [0] * len(STANDINGS_COLUMNS))
+        for i, value in enumerate((1, won, drawn, lost, scored, conceded, 3 * won + drawn)):
+            totals[i] += sign * value
+
+def _apply_standings_deltas(cursor, league_id, deltas):
+    rows = [(league_id, team, *totals) for team, totals in deltas.items() if any(totals)]
+    if not rows:
+        return
+    psycopg2.extras.execute_values(cursor, f'''
+        INSERT INTO team_standings (league_id, team, {', '.join(STANDINGS_COLUMNS)}) VALUES %s
+        ON CONFLICT (league_id, team) DO UPDATE SET
+            {', '.join(f"{column} = team_standings.{column} + EXCLUDED.{column}" for column in STANDINGS_COLUMNS)}
+    ''', rows)
+
+def _rebuild_team_standings(cursor, league_id=None):
+    cursor.execute("DELETE FROM team_standings WHERE %(league_id)s IS NULL OR league_id = %(league_id)s",
+                   {'league_id': league_id})
+    cursor.execute('''
+        WITH played AS (
+            SELECT league_id, home_team, away_team, regexp_match(score_str, '(\\d+)\\s*-\\s*(\\d+)') AS goals
+            FROM matches
+            WHERE score_str ~ %(pattern)s AND (%(league_id)s IS NULL OR league_id = %(league_id)s)
+              AND (NOT (%(teams)s::jsonb ? league_id)
+                   OR ((%(teams)s::jsonb -> league_id) ? home_team AND (%(teams)s::jsonb -> league_id) ? away_team))
+        ), sides AS (
+            SELECT league_id, home_team AS team, goals[1]::int AS scored, goals[2]::int AS conceded FROM played
+            UNION ALL
+            SELECT league_id, away_team, goals[2]::int, goals[1]::int FROM played
+        )
+        INSERT INTO team_standings (league_id, team, played, won, drawn, lost, goals_for, goals_against, points)
+        SELECT league_id, team, COUNT(*),
+               COUNT(*) FILTER (WHERE scored > conceded),
+               COUNT(*) FILTER (WHERE scored = conceded),
+               COUNT(*) FILTER (WHERE scored < conceded),
+               SUM(scored), SUM(conceded),
+               SUM(CASE WHEN scored > conceded THEN 3 WHEN scored = conceded THEN 1 ELSE 0 END)
+        FROM sides
+        GROUP BY league_id, team
+    ''', {'pattern': PLAYED_SCORE_PATTERN, 'league_id': league_id,
+          'teams': _standings_team_names_json()})
+
+def _standings_have_unknown_teams(cursor):
+    """Rows for teams off the roster - left by deltas from before matches against them were skipped"""
+    cursor.execute('''
+        SELECT EXISTS (
+            SELECT 1 FROM team_standings
+            WHERE %(teams)s::jsonb ? league_id AND NOT ((%(teams)s::jsonb -> league_id) ? team)
+        ) AS unknown
+    ''', {'teams': _standings_team_names_json()})
+    return cursor.fetchone()['unknown']
+
+def rebuild_team_standings(league_id):
+    """Recompute a league's standings from its matches - the repair path, writes keep them current"""
+    with db_cursor() as cursor:
+        _lock_team_standings(cursor, league_id)
+        _rebuild_team_standings(cursor, league_id)
+    print(f"Rebuilt team standings for {league_id}")
+
+def get_team_standings(league_id):
+    """Per-team totals of the league as stored (scraped team names, unsorted)"""
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute(f"SELECT team, {', '.join(STANDINGS_COLUMNS)} FROM team_standings WHERE league_id = %s",
+                       (league_id,))
+        return cursor.fetchall()
+
+# --- Upstream circuit breaker ---
+# Transitions run under SELECT ... FOR UPDATE and use the database clock, so every
+# process (gunicorn workers, scheduler, cron) agrees on the state and the cooldown.
+def _lock_upstream_circuit(cursor, name):
+    cursor.execute("INSERT INTO upstream_circuit (name) VALUES (%s) ON CONFLICT (name) DO NOTHING", (name,))
+    cursor.execute("SELECT *, LOCALTIMESTAMP AS db_now FROM upstream_circuit WHERE name = %s FOR UPDATE", (name,))
+    return cursor.fetchone()
+
+def get_upstream_circuit(name):
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute("SELECT *, LOCALTIMESTAMP AS db_now FROM upstream_circuit WHERE name = %s", (name,))
+        return cursor.fetchone()
+
+def enter_upstream_circuit(name, cooldown, probe_timeout):
+    """
+    May the caller contact the upstream? Returns (allowed, state).
+    An open circuit lets a single probe through (half_open) once `cooldown` has passed;
+    a probe that has not reported back within `probe_timeout` is replaced by a new one.
+    """
+    with db_cursor() as cursor:
+        row = _lock_upstream_circuit(cursor, name)
+        now = row['db_now']
+        if row['state'] == 'closed':
+            return True, 'closed'
+        if row['state'] == 'open' and now - row['opened_at'] < cooldown:
+            return False, 'open'
+        if row['state'] == 'half_open' and row['probe_started_at'] and now - row['probe_started_at'] < probe_timeout:
+            return False, 'half_open'
+        cursor.execute('''
+            UPDATE upstream_circuit SET state = 'half_open', probe_started_at = %s, updated_at = %s
+            WHERE name = %s
+        ''', (now, now, name))
+        return True, 'half_open'
+
+def record_upstream_circuit_result(name, success, failure_threshold, error=None):
+    """
+    Close the circuit on success; open it after `failure_threshold` failures in a row or a failed probe.
+    Returns (previous_state, state).
+    """
+    with db_cursor() as cursor:
+        row = _lock_upstream_circuit(cursor, name)
+        now = row['db_now']
+        if success:
+            cursor.execute('''
+                UPDATE upstream_circuit SET state = 'closed', failures = 0, opened_at = NULL,
+                       probe_started_at = NULL, updated_at = %s
+                WHERE name = %s
+                RETURNING state
+            ''', (now, name))
+        else:
+            failures = row['failures'] + 1
+            opens = row['state'] == 'half_open' or failures >= failure_threshold
+            cursor.execute('''
+                UPDATE upstream_circuit SET state = %s, failures = %s, last_error = %s, probe_started_at = NULL,
+                       opened_at = CASE WHEN %s THEN %s ELSE opened_at END, updated_at = %s
+                WHERE name = %s
+                RETURNING state
+            ''', ('open' if opens else row['state'], failures, error, opens, now, now, name))
+        return row['state'], cursor.fetchone()['state']
+
 def get_all_teams_for_league(league_id):
     """Get all unique team names that appear in matches for a league"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT DISTINCT home_team as team FROM matches WHERE league_id = %s
             UNION
@@ -340,19 +1011,19 @@ def get_all_teams_for_league(league_id):
 # === Admin User Functions ===
 def get_admin_user(username):
     """Get admin user by username"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT * FROM admin_users WHERE username = %s", (username,))
         return cursor.fetchone()
 
 def get_admin_user_by_id(user_id):
     """Get admin user by ID"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT * FROM admin_users WHERE id = %s", (user_id,))
         return cursor.fetchone()
 
 def get_all_admin_users():
     """Get all admin users"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT id, username, permissions, created_at FROM admin_users ORDER BY username")
         return cursor.fetchall()
 
@@ -404,14 +1075,14 @@ def delete_admin_user(user_id):
 # === Statistics Functions ===
 def get_total_matches():
     """Get total number of matches"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT COUNT(*) FROM matches")
         result = cursor.fetchone()
         return result['count'] if result else 0
 
 def get_total_teams():
     """Get total number of unique teams"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT COUNT(DISTINCT team) FROM (
                 SELECT home_team as team FROM matches
@@ -424,7 +1095,7 @@ def get_total_teams():
 
 def get_total_admin_users():
     """Get total number of admin users"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("SELECT COUNT(*) FROM admin_users")
         result = cursor.fetchone()
         return result['count'] if result else 0
@@ -432,7 +1103,7 @@ def get_total_admin_users():
 # === Team Management Functions ===
 def get_all_teams(league_filter=None):
     """Get all teams, optionally filtered by league"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         if league_filter:
             cursor.execute("""
                 SELECT t.*, 
@@ -456,7 +1127,7 @@ def get_all_teams(league_filter=None):
 
 def get_team_by_id(team_id):
     """Get team by ID with player count"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT t.*, 
                    COUNT(p.id) as player_count
@@ -507,7 +1178,7 @@ def delete_team(team_id):
 
 def get_team_by_name(name, exclude_id=None):
     """Check if team name exists (for uniqueness validation)"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         if exclude_id:
             cursor.execute("SELECT * FROM teams WHERE name = %s AND id != %s", (name, exclude_id))
         else:
@@ -516,7 +1187,7 @@ def get_team_by_name(name, exclude_id=None):
 
 def get_teams_count_by_league():
     """Get count of teams per league"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT league_id, COUNT(*) as count
             FROM teams
@@ -532,7 +1203,7 @@ def get_teams_count_by_league():
 # === Player Management Functions ===
 def get_players_by_team(team_id):
     """Get all players for specific team"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT p.*, t.name as team_name, t.league_id as team_league_id
             FROM players p
@@ -544,7 +1215,7 @@ def get_players_by_team(team_id):
 
 def get_all_players():
     """Get all players with team information"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT p.*, t.name as team_name, t.league_id as team_league_id
             FROM players p
@@ -555,7 +1226,7 @@ def get_all_players():
 
 def get_player_by_id(player_id):
     """Get player by ID with team information"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT p.*, t.name as team_name, t.league_id as team_league_id
             FROM players p
@@ -607,7 +1278,7 @@ def check_jersey_number_available(team_id, jersey_number, exclude_player_id=None
     if not jersey_number:
         return True
     
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         if exclude_player_id:
             cursor.execute("""
                 SELECT COUNT(*) FROM players 
@@ -623,22 +1294,28 @@ def check_jersey_number_available(team_id, jersey_number, exclude_player_id=None
         return result['count'] == 0 if result else True
 
 # === Match Results Functions ===
+MATCHES_FOR_RESULTS_QUERY = """
+    SELECT m.match_unique_id, m.home_team, m.away_team, m.league_id, 
+           m.date_str, m.score_str, m.venue,
+           mr.id as result_id, mr.home_score, mr.away_score, mr.status
+    FROM matches m
+    LEFT JOIN match_results mr ON m.match_unique_id = mr.match_id
+    ORDER BY m.date_obj DESC, m.league_id
+"""
+
 def get_all_matches_for_results():
     """Get all matches that can have detailed results"""
-    with db_cursor() as cursor:
-        cursor.execute("""
-            SELECT m.match_unique_id, m.home_team, m.away_team, m.league_id, 
-                   m.date_str, m.score_str, m.venue,
-                   mr.id as result_id, mr.home_score, mr.away_score, mr.status
-            FROM matches m
-            LEFT JOIN match_results mr ON m.match_unique_id = mr.match_id
-            ORDER BY m.date_obj DESC, m.league_id
-        """)
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute(MATCHES_FOR_RESULTS_QUERY)
         return cursor.fetchall()
 
+def iter_matches_for_results(batch_size=None):
+    """get_all_matches_for_results, streamed from a server-side cursor"""
+    return stream_rows(MATCHES_FOR_RESULTS_QUERY, batch_size=batch_size)
+
 def get_match_result_by_id(result_id):
     """Get detailed match result by result_id"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT mr.*, m.home_team, m.away_team, m.league_id, m.date_str, m.venue,
                    ht.name as home_team_name, at.name as away_team_name
@@ -652,7 +1329,7 @@ def get_match_result_by_id(result_id):
 
 def get_match_result_by_match_id(match_id):
     """Get match result by match_id"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT mr.*, m.home_team, m.away_team, m.league_id, m.date_str, m.venue,
                    ht.name as home_team_name, at.name as away_team_name
@@ -697,7 +1374,7 @@ def add_goal(match_result_id, player_id, team_id, minute, goal_type='regular', a
 
 def get_match_goals(match_result_id):
     """Get all goals for a match"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT g.*, p.name as player_name, p.jersey_number, t.name as team_name,
                    ap.name as assist_player_name
@@ -729,7 +1406,7 @@ def add_card(match_result_id, player_id, team_id, card_type, minute, reason=None
 
 def get_match_cards(match_result_id):
     """Get all cards for a match"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT mc.*, p.name as player_name, p.jersey_number, t.name as team_name
             FROM match_cards mc
@@ -749,7 +1426,7 @@ def delete_card(card_id):
 # === Helper Functions ===
 def get_team_players(team_id):
     """Get all players for a team"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT id, name, jersey_number
             FROM players 
@@ -760,7 +1437,7 @@ def get_team_players(team_id):
 
 def find_team_by_name(team_name, league_id=None):
     """Find team by name"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         if league_id:
             cursor.execute("SELECT id, name FROM teams WHERE name = %s AND league_id = %s", (team_name, league_id))
         else:
@@ -769,84 +1446,73 @@ def find_team_by_name(team_name, league_id=None):
 
 def get_match_by_unique_id(match_unique_id):
     """Get match by unique ID"""
-    with db_cursor() as cursor:
+    with db_cursor(read_only=True) as cursor:
         cursor.execute("""
             SELECT * FROM matches WHERE match_unique_id = %s
         """, (match_unique_id,))
         return cursor.fetchone()
 
+# One statement for the whole details document: the match, its admin result, and goals and
+# cards already split into home/away by json_agg FILTER. json columns arrive as Python dicts.
+MATCH_DETAILS_QUERY = """
+    SELECT m.match_unique_id, json_build_object(
+        'match', to_json(m),
+        'match_result', to_json(mr),
+        'goals', (
+            SELECT json_build_object(
+                'home', COALESCE(json_agg(to_json(g) ORDER BY g.minute) FILTER (WHERE g.team_name = m.home_team), '[]'),
+                'away', COALESCE(json_agg(to_json(g) ORDER BY g.minute) FILTER (WHERE g.team_name = m.away_team), '[]'))
+            FROM (
+                SELECT g.*, p.name as player_name, p.jersey_number, t.name as team_name,
+                       ap.name as assist_player_name
+                FROM goals g
+                JOIN players p ON g.player_id = p.id
+                JOIN teams t ON g.team_id = t.id
+                LEFT JOIN players ap ON g.assist_player_id = ap.id
+                WHERE g.match_result_id = mr.id
+            ) g),
+        'cards', (
+            SELECT json_build_object(
+                'home', COALESCE(json_agg(to_json(c) ORDER BY c.minute) FILTER (WHERE c.team_name = m.home_team), '[]'),
+                'away', COALESCE(json_agg(to_json(c) ORDER BY c.minute) FILTER (WHERE c.team_name = m.away_team), '[]'))
+            FROM (
+                SELECT mc.*, p.name as player_name, p.jersey_number, t.name as team_name
+                FROM match_cards mc
+                JOIN players p ON mc.player_id = p.id
+                JOIN teams t ON mc.team_id = t.id
+                WHERE mc.match_result_id = mr.id
+            ) c)
+    ) AS details
+    FROM matches m
+    LEFT JOIN match_results mr ON mr.match_id = m.match_unique_id
+"""
+
 def get_match_details(match_unique_id, league_id):
-    """Get complete match details including goals and cards"""
-    with db_cursor() as cursor:
-        # First get the match
-        cursor.execute("""
-            SELECT * FROM matches WHERE match_unique_id = %s
-        """, (match_unique_id,))
-        match = cursor.fetchone()
-        
-        if not match:
-            return None
-        
-        # Get match_result if it exists
-        cursor.execute("""
-            SELECT * FROM match_results WHERE match_id = %s
-        """, (match_unique_id,))
-        match_result = cursor.fetchone()
-        
-        if not match_result:
-            # No detailed data yet
-            return {
-                'match': dict(match),
-                'goals': {'home': [], 'away': []},
-                'cards': {'home': [], 'away': []}
-            }
-        
-        # Get goals
-        cursor.execute("""
-            SELECT g.*, p.name as player_name, p.jersey_number, t.name as team_name,
-                   ap.name as assist_player_name
-            FROM goals g
-            JOIN players p ON g.player_id = p.id
-            JOIN teams t ON g.team_id = t.id
-            LEFT JOIN players ap ON g.assist_player_id = ap.id
-            WHERE g.match_result_id = %s
-            ORDER BY g.minute
-        """, (match_result['id'],))
-        all_goals = cursor.fetchall()
-        
-        # Get cards
-        cursor.execute("""
-            SELECT mc.*, p.name as player_name, p.jersey_number, t.name as team_name
-            FROM match_cards mc
-            JOIN players p ON mc.player_id = p.id
-            JOIN teams t ON mc.team_id = t.id
-            WHERE mc.match_result_id = %s
-            ORDER BY mc.minute
-        """, (match_result['id'],))
-        all_cards = cursor.fetchall()
-        
-        # Separate goals and cards by team
-        home_team = match['home_team']
-        away_team = match['away_team']
-        
-        home_goals = [dict(g) for g in all_goals if g['team_name'] == home_team]
-        away_goals = [dict(g) for g in all_goals if g['team_name'] == away_team]
-        
-        home_cards = [dict(c) for c in all_cards if c['team_name'] == home_team]
-        away_cards = [dict(c) for c in all_cards if c['team_name'] == away_team]
-        
-        return {
-            'match': dict(match),
-            'match_result': dict(match_result) if match_result else None,
-            'goals': {
-                'home': home_goals,
-                'away': away_goals
-            },
-            'cards': {
-                'home': home_cards,
-                'away': away_cards
-            }
-        }
+    """
+    Get complete match details including goals and cards, in one round trip.
+    Values come from JSON, so dates and timestamps are ISO strings.
+    """
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute(MATCH_DETAILS_QUERY + "WHERE m.match_unique_id = %s", (match_unique_id,))
+        row = cursor.fetchone()
+    return row['details'] if row else None
+
+def get_match_details_for_ids(league_id, match_unique_ids, with_results_only=False):
+    """get_match_details for many matches of a league in one query: {match_unique_id: details}"""
+    if not match_unique_ids:
+        return {}
+    query = MATCH_DETAILS_QUERY + "WHERE m.league_id = %s AND m.match_unique_id = ANY(%s)"
+    if with_results_only:
+        query += " AND mr.id IS NOT NULL"
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute(query, (league_id, list(match_unique_ids)))
+        return {row['match_unique_id']: row['details'] for row in cursor.fetchall()}
+
+def get_match_details_for_round(league_id, round_url):
+    """get_match_details for every match of a round in one query: {match_unique_id: details}"""
+    with db_cursor(read_only=True) as cursor:
+        cursor.execute(MATCH_DETAILS_QUERY + "WHERE m.league_id = %s AND m.round_url = %s", (league_id, round_url))
+        return {row['match_unique_id']: row['details'] for row in cursor.fetchall()}
 
 if __name__ == '__main__':
     init_db_pool()
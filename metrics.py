@@ -0,0 +1,229 @@
+"""
+Scraper metrics: in-process counters and histograms, exported in the Prometheus text format.
+
+Both the scheduler (start_metrics_server) and the Flask app (/metrics) render the
+registry of their own process - each one is a separate Prometheus target.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds: upstream requests are 0.1-30s, parsing and DB writes are milliseconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 131072, 262144, 524288, 1048576, 4194304)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry[name] = self
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self, items):
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# --- Scraper metrics ---
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    'scraper_upstream_request_seconds', 'Latency of one upstream HTTP attempt', ('fetcher', 'attempt'))
+UPSTREAM_RESPONSES = Counter(
+    'scraper_upstream_responses_total', 'Upstream responses by HTTP status (error = no response)',
+    ('fetcher', 'status'))
+UPSTREAM_RESPONSE_BYTES = Histogram(
+    'scraper_upstream_response_bytes', 'Size of upstream response bodies', ('fetcher',), buckets=SIZE_BUCKETS)
+UPSTREAM_RETRIES = Counter(
+    'scraper_upstream_retries_total', 'Upstream attempts after the first one for the same page', ('fetcher',))
+CLOUDFLARE_CHALLENGES = Counter(
+    'scraper_cloudflare_challenges_total', 'Cloudflare challenge pages received instead of content')
+UPSTREAM_THROTTLED = Counter(
+    'scraper_upstream_throttled_total', 'Responses that made the rate limiter back off', ('reason',))
+PARSE_SECONDS = Histogram(
+    'scraper_parse_seconds', 'Time to parse one fetched page')
+PARSE_SKIPPED = Counter(
+    'scraper_parse_skipped_total', 'Pages whose parse was reused from the response cache', ('reason',))
+MATCHES_PARSED = Counter(
+    'scraper_matches_parsed_total', 'Match rows parsed from fixtures tables')
+DB_WRITE_SECONDS = Histogram(
+    'scraper_db_write_seconds', 'Time to write one round of matches to the database', ('operation',))
+DB_MATCHES_WRITTEN = Counter(
+    'scraper_db_matches_written_total', 'Match rows inserted or updated, by change type', ('change',))
+CIRCUIT_REJECTIONS = Counter(
+    'scraper_circuit_rejections_total', 'Scrapes skipped because the upstream circuit was open')
+CIRCUIT_TRANSITIONS = Counter(
+    'scraper_circuit_transitions_total', 'Upstream circuit breaker state changes', ('state',))
+DB_POOL_WAIT_SECONDS = Histogram(
+    'db_pool_wait_seconds', 'Time spent waiting for a free database connection')
+DB_POOL_EXHAUSTED = Counter(
+    'db_pool_exhausted_total', 'Checkouts that gave up because no connection became free')
+DB_POOL_IN_USE = Gauge(
+    'db_pool_connections_in_use', 'Database connections currently checked out')
+LEAGUE_SCRAPE_SECONDS = Histogram(
+    'scraper_league_scrape_seconds', 'Wall time of one league scrape', ('league', 'status'))
+
+
+def observe_upstream(fetcher, attempt, started, status=None, size=None):
+    """
+    Record one upstream attempt (attempt is 0-based, started a time.perf_counter() value).
+    fetcher: main_page (retry ladder), threads or asyncio (round pages).
+    """
+    UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, fetcher=fetcher, attempt=attempt + 1)
+    UPSTREAM_RESPONSES.inc(fetcher=fetcher, status=status if status is not None else 'error')
+    if size is not None:
+        UPSTREAM_RESPONSE_BYTES.observe(size, fetcher=fetcher)
+    if attempt > 0:
+        UPSTREAM_RETRIES.inc(fetcher=fetcher)
+
+
+# --- Standalone exporter for the scheduler process ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Prometheus scrapes every few seconds - keep the scheduler log readable
+
+
+def start_metrics_server(port=None, host=None):
+    """Serve /metrics from a daemon thread; returns the server or None when disabled (port 0)"""
+    port = int(port if port is not None else os.environ.get('SCRAPER_METRICS_PORT', 9108))
+    host = host or os.environ.get('SCRAPER_METRICS_HOST', '0.0.0.0')
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-exporter', daemon=True).start()
+    return server
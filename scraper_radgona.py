@@ -4,21 +4,62 @@ import re
 import os
 import time
 import random
-from urllib.parse import urljoin
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
+import gzip
+from urllib.parse import urljoin, urlparse
+from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import schedule
 import threading
+import queue
+import asyncio
+import metrics
+
+# Optional asyncio fetch engine for full-season scrapes
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
 
 # Import database functions for saving scraped data
 try:
-    from database import cache_matches, init_db, init_db_pool
+    from database import cache_matches, cache_matches_bulk, init_db, init_db_pool, get_round_refresh_plan, get_unplayed_kickoffs, summarize_changes
+    from database import get_upstream_circuit, record_upstream_circuit_result
+    from database import enter_upstream_circuit as enter_upstream_circuit_db
     DATABASE_AVAILABLE = True
 except ImportError:
     print("[WARNING] database.py not found - running without database support")
     DATABASE_AVAILABLE = False
 
-BASE_URL = "https://www.lmn-radgona.si"
+# SCRAPER_BASE_URL points the scraper at another upstream, e.g. benchmarks/fake_upstream.py
+BASE_URL = os.environ.get('SCRAPER_BASE_URL', "https://www.lmn-radgona.si").rstrip('/')
+
+# Leagues scraped by the scheduler
+LEAGUES = [
+    {
+        'id': 'liga_a',
+        'name': 'Liga A',
+        'url': f'{BASE_URL}/index.php/ct-menu-item-7/razpored-liga-a'
+    },
+    {
+        'id': 'liga_b',
+        'name': 'Liga B',
+        'url': f'{BASE_URL}/index.php/2017-08-11-13-54-06/razpored-liga-b'
+    }
+]
+
+def league_for_url(url):
+    """Return the league id whose results page the URL belongs to (round URLs extend the league path)"""
+    path = urlparse(url).path
+    for league in LEAGUES:
+        if path.startswith(urlparse(league['url']).path):
+            return league['id']
+    return None
 
 def parse_slovene_date_from_header(date_str_full):
     if not date_str_full or not isinstance(date_str_full, str):
@@ -184,6 +225,7 @@ def _parse_matches_from_soup(soup_obj, round_name_for_match="N/A", round_url_sou
                     })
                 except Exception as e_parse:
                     print(f"Error parsing match row: {e_parse}")
+    metrics.MATCHES_PARSED.inc(len(matches_found))
     return matches_found
 
 def get_rotating_user_agents():
@@ -204,25 +246,172 @@ def get_rotating_user_agents():
         'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36'
     ]
 
-def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id_for_caching=None):
+# --- On-disk HTTP response cache (conditional GET) ---
+RESPONSE_CACHE_DIR = os.environ.get(
+    'SCRAPER_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.scraper_cache'))
+
+def response_cache_enabled():
+    return os.environ.get('SCRAPER_RESPONSE_CACHE', 'true').lower() == 'true'
+
+def _response_cache_path(url):
+    return os.path.join(RESPONSE_CACHE_DIR, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+def load_cached_response(url):
+    """Return the stored cache entry for a URL or None"""
+    if not response_cache_enabled():
+        return None
+    try:
+        with open(_response_cache_path(url), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def store_cached_response(url, response_headers, content_hash, parse_key, parsed):
+    if not response_cache_enabled():
+        return
+    entry = {
+        'url': url,
+        'etag': response_headers.get('ETag'),
+        'last_modified': response_headers.get('Last-Modified'),
+        'content_hash': content_hash,
+        'parse_key': parse_key,
+        'parsed': _encode_parsed_page(parsed),
+        'stored_at': datetime.now().isoformat()
+    }
+    try:
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+        path = _response_cache_path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARNING] Could not write response cache for {url}: {e}")
+
+def load_cached_parse(url, parse_key=None):
+    """
+    The cache entry for a URL if its parse was made with the same parse_key, else None - a 304
+    could not be served from a parse made for another key. Load it once per fetch and hand it
+    to both conditional_request_headers and parse_page_with_cache.
+    """
+    entry = load_cached_response(url)
+    return entry if entry and entry.get('parse_key') == parse_key else None
+
+def conditional_request_headers(entry):
+    """If-None-Match / If-Modified-Since headers for an entry from load_cached_parse"""
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def _encode_parsed_page(parsed):
+    encoded = dict(parsed)
+    encoded['matches'] = [
+        dict(m, date_obj=m['date_obj'].isoformat() if m.get('date_obj') else None)
+        for m in parsed.get('matches', [])
+    ]
+    return encoded
+
+def _decode_parsed_page(encoded):
+    parsed = dict(encoded)
+    parsed['matches'] = [
+        dict(m, date_obj=datetime.strptime(m['date_obj'], '%Y-%m-%d').date() if m.get('date_obj') else None)
+        for m in encoded.get('matches', [])
+    ]
+    return parsed
+
+# --- Compressed raw HTML archive (offline reparse) ---
+ARCHIVE_DIR = os.environ.get(
+    'SCRAPER_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.scraper_archive'))
+
+def html_archive_enabled():
+    return os.environ.get('SCRAPER_HTML_ARCHIVE', 'true').lower() == 'true'
+
+def _archive_url_dir(url):
+    return os.path.join(ARCHIVE_DIR, hashlib.sha256(url.encode('utf-8')).hexdigest()[:24])
+
+def _archived_snapshots(url_dir):
+    # Snapshot names start with the fetch time, so lexical order is chronological
+    return sorted(name for name in os.listdir(url_dir) if name.endswith('.html.gz'))
+
+def archive_page(url, content, content_hash):
+    """
+    Store a gzip-compressed copy of a fetched page under <archive>/<url hash>/<fetch time>_<body hash>.html.gz.
+    A body identical to the newest snapshot of the URL is not stored again.
+    """
+    if not html_archive_enabled() or not content:
+        return
+    url_dir = _archive_url_dir(url)
+    try:
+        os.makedirs(url_dir, exist_ok=True)
+        snapshots = _archived_snapshots(url_dir)
+        if snapshots and snapshots[-1].endswith(f"_{content_hash[:16]}.html.gz"):
+            return
+        url_file = os.path.join(url_dir, 'url.txt')
+        if not os.path.exists(url_file):
+            with open(url_file, 'w', encoding='utf-8') as f:
+                f.write(url)
+        path = os.path.join(url_dir, f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{content_hash[:16]}.html.gz")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARNING] Could not archive {url}: {e}")
+
+def iter_archived_pages(latest_only=True):
+    """Yield (url, snapshot_path, fetched_at_key) for archived pages, newest snapshot only by default"""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return
+    for dir_name in sorted(os.listdir(ARCHIVE_DIR)):
+        url_dir = os.path.join(ARCHIVE_DIR, dir_name)
+        try:
+            with open(os.path.join(url_dir, 'url.txt'), 'r', encoding='utf-8') as f:
+                url = f.read().strip()
+            snapshots = _archived_snapshots(url_dir)
+        except OSError:
+            continue
+        for name in (snapshots[-1:] if latest_only else snapshots):
+            yield url, os.path.join(url_dir, name), name.split('_', 1)[0]
+
+def parse_page_with_cache(url, status_code, response_headers, content, parse_fn, entry, parse_key=None):
+    """
+    Return parse_fn(content), or the stored parse result when the page has not changed
+    (304 Not Modified or byte-identical body). entry is the load_cached_parse result the
+    request's validators came from. Returns None for a 304 without a cached copy.
+    """
     debug_mode = os.environ.get('SCRAPER_DEBUG', 'false').lower() == 'true'
-    
-    if debug_mode:
-        print(f"[DEBUG] Starting scrape for: {url_to_scrape}")
-        print(f"[DEBUG] Fetch all rounds: {fetch_all_rounds_data}")
-    
-    page_matches = []
-    all_match_data_for_leaderboard = [] if fetch_all_rounds_data else None
-    available_rounds = []
-    current_round_info = {'name': "N/A", 'url': url_to_scrape, 'id': None}
-    
-    # Rotate through different user agents to avoid detection
-    user_agents = get_rotating_user_agents()
-    selected_ua = random.choice(user_agents)
-    
-    if debug_mode:
-        print(f"[DEBUG] Using User-Agent: {selected_ua.split('/')[-1].split()[0] if '/' in selected_ua else selected_ua[:50]}")
-    
+
+    if status_code == 304:
+        if entry is None:
+            return None
+        if debug_mode:
+            print(f"[DEBUG] [CACHE] 304 Not Modified: {url}")
+        metrics.PARSE_SKIPPED.inc(reason='not_modified')
+        return _decode_parsed_page(entry['parsed'])
+
+    content_hash = hashlib.sha256(content).hexdigest()
+    archive_page(url, content, content_hash)
+    if entry and entry.get('content_hash') == content_hash:
+        if debug_mode:
+            print(f"[DEBUG] [CACHE] Body unchanged, skipping parse: {url}")
+        metrics.PARSE_SKIPPED.inc(reason='unchanged_body')
+        # Refresh validators so the next request can be a conditional one
+        if (response_headers.get('ETag') != entry.get('etag')
+                or response_headers.get('Last-Modified') != entry.get('last_modified')):
+            store_cached_response(url, response_headers, content_hash, parse_key, _decode_parsed_page(entry['parsed']))
+        return _decode_parsed_page(entry['parsed'])
+
+    with metrics.PARSE_SECONDS.time():
+        parsed = parse_fn(content)
+    store_cached_response(url, response_headers, content_hash, parse_key, parsed)
+    return parsed
+
+def build_browser_headers(selected_ua):
+    """Browser-like request headers matching the given User-Agent"""
     # Determine if this is a mobile user agent
     is_mobile = 'Mobile' in selected_ua or 'iPhone' in selected_ua or 'Android' in selected_ua
     
@@ -286,40 +475,800 @@ def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1'
         }
-    
+    return headers
+
+# --- Shared adaptive rate limiter ---
+# One token bucket for every request this process sends upstream (scheduler, cron endpoint,
+# web fallback, thread and asyncio round fetches). The refill rate grows additively while
+# responses are fine and is halved on 403/415/429/503 or a Cloudflare challenge.
+RATE_LIMIT_MIN_RPS = float(os.environ.get('SCRAPER_RATE_MIN_RPS', 0.2))
+RATE_LIMIT_MAX_RPS = float(os.environ.get('SCRAPER_RATE_MAX_RPS', 4))
+RATE_LIMIT_BURST = float(os.environ.get('SCRAPER_RATE_BURST', 3))
+RATE_LIMIT_STEP = 0.1                     # requests/s added per successful response
+RATE_LIMIT_COOLDOWN = 10                  # seconds of silence after a throttle without Retry-After
+THROTTLE_STATUS_CODES = (403, 415, 429, 503)
+RATE_STATE_FILE = os.environ.get('SCRAPER_RATE_STATE_FILE', os.path.join(RESPONSE_CACHE_DIR, 'rate_limit.json'))
+
+CLOUDFLARE_INDICATORS = [
+    "One moment, please",
+    "Please wait while your request is being verified",
+    "DDoS protection by Cloudflare",
+    "cf-browser-verification",
+    "Checking your browser",
+    "__cf_bm"
+]
+
+_rate_lock = threading.Lock()
+_rate_state = None
+
+def looks_like_cloudflare_challenge(text):
+    return any(indicator in text for indicator in CLOUDFLARE_INDICATORS)
+
+def _load_rate_state():
+    state = {
+        'rate': min(RATE_LIMIT_MAX_RPS, max(RATE_LIMIT_MIN_RPS, float(os.environ.get('SCRAPER_RATE_START_RPS', 1)))),
+        'tokens': RATE_LIMIT_BURST,
+        'updated': time.monotonic(),
+        'blocked_until': 0.0,
+        'requests': 0,
+        'throttled': 0,
+        'last_throttle': None,
+        'saved_at': 0.0
+    }
+    # Keep the learned rate (and an active cooldown) across restarts
+    try:
+        with open(RATE_STATE_FILE, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        state['rate'] = min(RATE_LIMIT_MAX_RPS, max(RATE_LIMIT_MIN_RPS, float(stored['rate'])))
+        state['blocked_until'] = time.monotonic() + max(0.0, stored.get('blocked_until_epoch', 0) - time.time())
+        state['last_throttle'] = stored.get('last_throttle')
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return state
+
+def _save_rate_state(state):
+    try:
+        os.makedirs(os.path.dirname(RATE_STATE_FILE), exist_ok=True)
+        tmp_path = f"{RATE_STATE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'rate': state['rate'],
+                'blocked_until_epoch': time.time() + max(0.0, state['blocked_until'] - time.monotonic()),
+                'last_throttle': state['last_throttle']
+            }, f)
+        os.replace(tmp_path, RATE_STATE_FILE)
+        state['saved_at'] = time.monotonic()
+    except OSError as e:
+        print(f"[WARNING] Could not persist rate limiter state: {e}")
+
+def _get_rate_state():
+    global _rate_state
+    if _rate_state is None:
+        _rate_state = _load_rate_state()
+    return _rate_state
+
+def reserve_request_slot():
+    """Take one token from the bucket; returns how many seconds the caller has to wait before sending"""
+    with _rate_lock:
+        state = _get_rate_state()
+        now = time.monotonic()
+        state['tokens'] = min(RATE_LIMIT_BURST, state['tokens'] + (now - state['updated']) * state['rate'])
+        state['updated'] = now
+        state['tokens'] -= 1
+        state['requests'] += 1
+        # Negative tokens are requests already queued ahead of us
+        wait = -state['tokens'] / state['rate'] if state['tokens'] < 0 else 0.0
+        return max(wait, state['blocked_until'] - now)
+
+def acquire_request_slot():
+    wait = reserve_request_slot()
+    if wait > 0:
+        time.sleep(wait)
+
+async def acquire_request_slot_async():
+    wait = reserve_request_slot()
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+def record_upstream_response(status_code, challenge=False, retry_after=None):
+    """Feed a response back into the limiter: speed up on success, back off on blocking/throttling"""
+    throttled = challenge or status_code in THROTTLE_STATUS_CODES
+    if not throttled and not (200 <= status_code < 400):
+        return
+    with _rate_lock:
+        state = _get_rate_state()
+        now = time.monotonic()
+        if throttled:
+            if challenge:
+                metrics.CLOUDFLARE_CHALLENGES.inc()
+            metrics.UPSTREAM_THROTTLED.inc(reason='cloudflare' if challenge else str(status_code))
+            state['rate'] = max(RATE_LIMIT_MIN_RPS, state['rate'] / 2)
+            state['tokens'] = min(state['tokens'], 0.0)
+            try:
+                cooldown = float(retry_after) if retry_after else RATE_LIMIT_COOLDOWN
+            except ValueError:
+                cooldown = RATE_LIMIT_COOLDOWN
+            state['blocked_until'] = max(state['blocked_until'], now + cooldown)
+            state['throttled'] += 1
+            state['last_throttle'] = {
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'reason': 'cloudflare challenge' if challenge else f"HTTP {status_code}"
+            }
+            print(f"[RATE LIMIT] Upstream pushback ({state['last_throttle']['reason']}) - "
+                  f"rate lowered to {state['rate']:.2f} req/s, pausing {cooldown:.0f}s")
+            _save_rate_state(state)
+        else:
+            state['rate'] = min(RATE_LIMIT_MAX_RPS, state['rate'] + RATE_LIMIT_STEP)
+            if now - state['saved_at'] > 10:
+                _save_rate_state(state)
+
+def get_rate_limit_status():
+    """Current limiter budget, for status pages and cron responses"""
+    with _rate_lock:
+        state = _get_rate_state()
+        now = time.monotonic()
+        tokens = min(RATE_LIMIT_BURST, state['tokens'] + (now - state['updated']) * state['rate'])
+        return {
+            'rate_per_second': round(state['rate'], 3),
+            'min_rate_per_second': RATE_LIMIT_MIN_RPS,
+            'max_rate_per_second': RATE_LIMIT_MAX_RPS,
+            'tokens_available': round(tokens, 2),
+            'burst': RATE_LIMIT_BURST,
+            'paused_for_seconds': round(max(0.0, state['blocked_until'] - now), 1),
+            'requests_total': state['requests'],
+            'throttled_total': state['throttled'],
+            'last_throttle': state['last_throttle']
+        }
+
+# --- Upstream circuit breaker ---
+# Shared through Postgres (upstream_circuit) so web workers, the scheduler and cron see one
+# state; without a database each process keeps its own copy in memory.
+CIRCUIT_NAME = 'lmn_radgona'
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('SCRAPER_CIRCUIT_FAILURES', 3))
+CIRCUIT_COOLDOWN = timedelta(seconds=float(os.environ.get('SCRAPER_CIRCUIT_COOLDOWN', 300)))
+CIRCUIT_PROBE_TIMEOUT = timedelta(seconds=90)   # longer than the slowest retry ladder
+
+_local_circuit = {'state': 'closed', 'failures': 0, 'opened_at': None, 'probe_started_at': None, 'last_error': None}
+_local_circuit_lock = threading.Lock()
+
+class UpstreamCircuitOpen(Exception):
+    """The upstream has been failing - callers should serve cached data instead of scraping"""
+
+def circuit_breaker_enabled():
+    return os.environ.get('SCRAPER_CIRCUIT_BREAKER', 'true').lower() == 'true'
+
+def _shared_circuit(action, *args):
+    """Run a database circuit function; None when there is no usable database (local fallback)"""
+    if not DATABASE_AVAILABLE or not os.environ.get('DATABASE_URL'):
+        return None
+    try:
+        return action(CIRCUIT_NAME, *args)
+    except Exception as e:
+        print(f"[CIRCUIT] Shared state unavailable, using in-process state: {e}")
+        return None
+
+def _enter_local_circuit():
+    with _local_circuit_lock:
+        now = datetime.now()
+        state = _local_circuit['state']
+        if state == 'closed':
+            return True, 'closed'
+        if state == 'open' and now - _local_circuit['opened_at'] < CIRCUIT_COOLDOWN:
+            return False, 'open'
+        if state == 'half_open' and now - _local_circuit['probe_started_at'] < CIRCUIT_PROBE_TIMEOUT:
+            return False, 'half_open'
+        _local_circuit.update(state='half_open', probe_started_at=now)
+        return True, 'half_open'
+
+def _record_local_circuit(success, error):
+    with _local_circuit_lock:
+        previous = _local_circuit['state']
+        if success:
+            _local_circuit.update(state='closed', failures=0, opened_at=None, probe_started_at=None)
+            return previous, 'closed'
+        _local_circuit['failures'] += 1
+        _local_circuit.update(last_error=error, probe_started_at=None)
+        if _local_circuit['state'] == 'half_open' or _local_circuit['failures'] >= CIRCUIT_FAILURE_THRESHOLD:
+            _local_circuit.update(state='open', opened_at=datetime.now())
+        return previous, _local_circuit['state']
+
+def enter_upstream_circuit():
+    """Raise UpstreamCircuitOpen unless the caller may contact the upstream (closed, or the half-open probe)"""
+    if not circuit_breaker_enabled():
+        return
+    result = _shared_circuit(enter_upstream_circuit_db, CIRCUIT_COOLDOWN, CIRCUIT_PROBE_TIMEOUT)
+    allowed, state = result if result is not None else _enter_local_circuit()
+    if not allowed:
+        metrics.CIRCUIT_REJECTIONS.inc()
+        raise UpstreamCircuitOpen(f"Upstream circuit {state} - skipping live scrape")
+    if state == 'half_open':
+        print("[CIRCUIT] Half-open: probing the upstream with this request")
+
+def record_upstream_outcome(success, error=None):
+    """Report whether a scrape got through to the upstream (page fetched) or was blocked/failed"""
+    if not circuit_breaker_enabled():
+        return
+    result = _shared_circuit(record_upstream_circuit_result, success, CIRCUIT_FAILURE_THRESHOLD, error)
+    previous, state = result if result is not None else _record_local_circuit(success, error)
+    if state != previous:
+        print(f"[CIRCUIT] {previous} -> {state}" + (f" ({error})" if error else ""))
+        metrics.CIRCUIT_TRANSITIONS.inc(state=state)
+
+def get_circuit_status():
+    """Current breaker state without taking the probe slot (for the web fallback and status pages)"""
+    row = _shared_circuit(get_upstream_circuit) if circuit_breaker_enabled() else None
+    if row is None:
+        with _local_circuit_lock:
+            row = dict(_local_circuit, db_now=datetime.now())
+    state = row['state'] if circuit_breaker_enabled() else 'disabled'
+    retry_in = None
+    if state == 'open':
+        retry_in = max(0.0, (row['opened_at'] + CIRCUIT_COOLDOWN - row['db_now']).total_seconds())
+    elif state == 'half_open' and row['probe_started_at']:
+        retry_in = max(0.0, (row['probe_started_at'] + CIRCUIT_PROBE_TIMEOUT - row['db_now']).total_seconds())
+    return {
+        'state': state,
+        'failures': row['failures'],
+        'failure_threshold': CIRCUIT_FAILURE_THRESHOLD,
+        'opened_at': row['opened_at'].isoformat(timespec='seconds') if row['opened_at'] else None,
+        'probe_in_seconds': round(retry_in, 1) if retry_in is not None else None,
+        'last_error': row['last_error']
+    }
+
+def upstream_circuit_is_open():
+    """True while scrapes would be short-circuited (open and cooling down, or a probe in flight)"""
+    status = get_circuit_status()
+    return status['state'] in ('open', 'half_open') and bool(status['probe_in_seconds'])
+
+# --- Warmed scraper session pool ---
+SESSION_STATE_FILE = os.environ.get('SCRAPER_SESSION_FILE', os.path.join(RESPONSE_CACHE_DIR, 'session_state.json'))
+SESSION_MAX_AGE = timedelta(hours=float(os.environ.get('SCRAPER_SESSION_MAX_AGE_HOURS', 6)))
+_idle_sessions = []
+_session_pool_lock = threading.Lock()
+
+def _new_browser_session(debug_mode=False):
+    # Rotate through different user agents to avoid detection
+    selected_ua = random.choice(get_rotating_user_agents())
+    if debug_mode:
+        print(f"[DEBUG] Using User-Agent: {selected_ua.split('/')[-1].split()[0] if '/' in selected_ua else selected_ua[:50]}")
     session = requests.Session()
-    session.headers.update(headers)
-    
+    session.headers.update(build_browser_headers(selected_ua))
+    return session
+
+def _warm_up_session(session, debug_mode=False):
+    """Visit the homepage so Cloudflare hands out its cookies before the real request"""
+    session.warmed_at = datetime.now()
+    session.needs_rewarm = False
+    # First establish session by visiting homepage (helps bypass bot detection)
     try:
-        # First establish session by visiting homepage (helps bypass bot detection)
-        try:
-            homepage_response = session.get(BASE_URL, timeout=30)
+        acquire_request_slot()
+        homepage_response = session.get(BASE_URL, timeout=30)
+        if debug_mode:
+            print(f"[DEBUG] Homepage visit status: {homepage_response.status_code}")
+
+        # Check for Cloudflare challenge on homepage
+        challenge = looks_like_cloudflare_challenge(homepage_response.text)
+        record_upstream_response(homepage_response.status_code, challenge,
+                                 homepage_response.headers.get('Retry-After'))
+        if challenge:
             if debug_mode:
-                print(f"[DEBUG] Homepage visit status: {homepage_response.status_code}")
-            
-            # Check for Cloudflare challenge on homepage
-            if "One moment, please" in homepage_response.text:
+                print(f"[DEBUG] Cloudflare challenge detected on homepage")
+            raise Exception("Cloudflare bot detection active")
+
+    except Exception as e:
+        if debug_mode:
+            print(f"[DEBUG] Homepage visit failed: {e}")
+        # Continue anyway, but log the issue and warm up again next time
+        session.needs_rewarm = True
+
+def _session_is_fresh(session):
+    warmed_at = getattr(session, 'warmed_at', None)
+    return (warmed_at is not None and not getattr(session, 'needs_rewarm', False)
+            and datetime.now() - warmed_at < SESSION_MAX_AGE)
+
+def _load_persisted_session():
+    try:
+        with open(SESSION_STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    session = requests.Session()
+    session.headers.clear()
+    session.headers.update(state.get('headers', {}))
+    for cookie in state.get('cookies', []):
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''),
+                            path=cookie.get('path', '/'), expires=cookie.get('expires'),
+                            secure=cookie.get('secure', False))
+    session.warmed_at = datetime.fromisoformat(state['warmed_at']) if state.get('warmed_at') else None
+    session.needs_rewarm = False
+    return session
+
+def _persist_session(session):
+    state = {
+        'headers': dict(session.headers),
+        'cookies': [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+             'expires': c.expires, 'secure': c.secure}
+            for c in session.cookies
+        ],
+        'warmed_at': session.warmed_at.isoformat() if getattr(session, 'warmed_at', None) else None
+    }
+    try:
+        os.makedirs(os.path.dirname(SESSION_STATE_FILE) or '.', exist_ok=True)
+        tmp_path = f"{SESSION_STATE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, SESSION_STATE_FILE)
+    except OSError as e:
+        print(f"[WARNING] Could not persist scraper session: {e}")
+
+def checkout_scraper_session():
+    """
+    Return a warmed requests session - an idle pooled one, one restored from disk,
+    or a brand new one that has just visited the homepage.
+    """
+    debug_mode = os.environ.get('SCRAPER_DEBUG', 'false').lower() == 'true'
+    with _session_pool_lock:
+        while _idle_sessions:
+            session = _idle_sessions.pop()
+            if _session_is_fresh(session):
                 if debug_mode:
-                    print(f"[DEBUG] Cloudflare challenge detected on homepage")
-                raise Exception("Cloudflare bot detection active")
-                
-            # Wait like a human would before navigating (longer for production)
-            delay = random.uniform(2, 5)
-            if debug_mode:
-                print(f"[DEBUG] Human-like delay: {delay:.1f}s")
-            time.sleep(delay)
-            
+                    print(f"[DEBUG] Reusing pooled session warmed at {session.warmed_at}")
+                return session
+            session.close()
+
+    session = _load_persisted_session()
+    if session is not None and _session_is_fresh(session):
+        if debug_mode:
+            print(f"[DEBUG] Restored persisted session warmed at {session.warmed_at}")
+        return session
+
+    session = _new_browser_session(debug_mode)
+    _warm_up_session(session, debug_mode)
+    return session
+
+def release_scraper_session(session):
+    """Return a session to the pool; sessions that hit a challenge are dropped so the next scrape re-warms"""
+    if not _session_is_fresh(session):
+        session.close()
+        if getattr(session, 'needs_rewarm', False):
+            invalidate_scraper_sessions()
+        return
+    _persist_session(session)
+    with _session_pool_lock:
+        _idle_sessions.append(session)
+
+def invalidate_scraper_sessions():
+    """Forget all warmed sessions (pooled and persisted)"""
+    with _session_pool_lock:
+        while _idle_sessions:
+            _idle_sessions.pop().close()
+    try:
+        os.remove(SESSION_STATE_FILE)
+    except OSError:
+        pass
+
+# --- Targeted HTML parsing ---
+# The parsers only read table.fixtures-results, select#select-round and td.contentheading,
+# so the fast path slices those elements out of the raw HTML and builds a tree of just them.
+# That only pays off while the page chrome is a large part of the page: the fixtures table is
+# parsed either way, and bench_parse.py puts the crossover at ~120-150 match rows (fragments
+# ~87% of the page; 4x faster at 7 rows, 1.1x at 100, 0.92-0.96x from 150 rows up). Pages where
+# the table and round select exceed SCRAPER_FAST_PARSE_MAX_SHARE of the HTML get a plain full parse.
+FAST_PARSE_MAX_SHARE = float(os.environ.get('SCRAPER_FAST_PARSE_MAX_SHARE', 0.85))
+_FIXTURES_TABLE_START = re.compile(r'<table\b[^>]*\bclass\s*=\s*["\']?[^"\'>]*\bfixtures-results\b', re.I)
+_TABLE_TAG = re.compile(r'<(/?)table\b', re.I)
+_ROUND_SELECT_START = re.compile(r'<select\b[^>]*\bid\s*=\s*["\']?select-round\b', re.I)
+_SELECT_END = re.compile(r'</select\s*>', re.I)
+_CONTENT_HEADING_START = re.compile(r'<td\b[^>]*\bclass\s*=\s*["\']?[^"\'>]*\bcontentheading\b', re.I)
+_TD_END = re.compile(r'</td\s*>', re.I)
+
+def fast_parse_enabled():
+    return os.environ.get('SCRAPER_FAST_PARSE', 'true').lower() == 'true'
+
+def get_html_parser():
+    """BeautifulSoup tree builder - 'html.parser' (default) or 'lxml' if installed"""
+    return os.environ.get('SCRAPER_HTML_PARSER', 'html.parser')
+
+def _slice_element(html, start_match, end_pattern=None, nested_pattern=None):
+    start = start_match.start()
+    if nested_pattern is not None:
+        depth = 0
+        for tag in nested_pattern.finditer(html, start):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                close = html.find('>', tag.end())
+                return (start, close + 1) if close != -1 else None
+        return None
+    end = end_pattern.search(html, start_match.end())
+    return (start, end.end()) if end else None
+
+def _extract_target_fragments(html):
+    """
+    Return the target elements' markup in document order, or None to fall back to a full parse
+    (elements missing, or the table and round select are more than FAST_PARSE_MAX_SHARE of the page)
+    """
+    table_start = _FIXTURES_TABLE_START.search(html)
+    select_start = _ROUND_SELECT_START.search(html)
+    if not table_start or not select_start:
+        return None
+    spans = [
+        _slice_element(html, table_start, nested_pattern=_TABLE_TAG),
+        _slice_element(html, select_start, end_pattern=_SELECT_END)
+    ]
+    if None in spans:
+        return None
+    if sum(end - start for start, end in spans) > FAST_PARSE_MAX_SHARE * len(html):
+        return None
+    for heading_start in _CONTENT_HEADING_START.finditer(html):
+        heading_span = _slice_element(html, heading_start, end_pattern=_TD_END)
+        if heading_span:
+            spans.append(heading_span)
+
+    fragments = []
+    last_end = -1
+    for start, end in sorted(spans):
+        if start < last_end:  # already inside a previous fragment
+            continue
+        fragments.append(html[start:end])
+        last_end = end
+    return fragments
+
+def make_soup(content):
+    """Build a BeautifulSoup tree for a fetched page, using the targeted fast path when possible"""
+    parser = get_html_parser()
+    if fast_parse_enabled():
+        try:
+            html = content.decode('utf-8') if isinstance(content, bytes) else content
+        except UnicodeDecodeError:
+            html = None
+        fragments = _extract_target_fragments(html) if html else None
+        if fragments:
+            return BeautifulSoup(''.join(fragments), parser)
+    return BeautifulSoup(content, parser)
+
+def _parse_main_page(content, url_to_scrape):
+    soup = make_soup(content)
+    available_rounds, current_round_info = extract_round_options_and_current(soup, url_to_scrape)
+    if current_round_info['name'] == "N/A":
+        current_round_info = {'name': "N/A", 'url': url_to_scrape, 'id': None}
+    matches = _parse_matches_from_soup(soup, current_round_info['name'], current_round_info['url'])
+    return {'rounds': available_rounds, 'current_round': current_round_info, 'matches': matches}
+
+def _parse_round_page(content, round_opt):
+    soup = make_soup(content)
+    return {'matches': _parse_matches_from_soup(soup, round_opt['name'], round_opt['url'])}
+
+# --- Multi-core parse stage ---
+# Threads fetch, but BeautifulSoup holds the GIL while it parses, so round pages are parsed in a
+# process pool instead. Workers get raw bytes and return compact tuples (cheap to pickle).
+# Off by default (web app, serverless cron); the long-running CLI modes opt in.
+MATCH_RECORD_FIELDS = ('round_name', 'round_url', 'date_str', 'date_obj', 'time',
+                       'home_team', 'score_str', 'away_team', 'venue')
+
+_parse_pool = None
+_parse_pool_unavailable = False
+_parse_pool_lock = threading.Lock()
+_bad_parse_processes = None
+
+def parse_processes():
+    """SCRAPER_PARSE_PROCESSES: 0 to parse in the fetching thread (default), a number, or 'auto' (one per CPU core)"""
+    global _bad_parse_processes
+    value = os.environ.get('SCRAPER_PARSE_PROCESSES', '0').strip().lower()
+    try:
+        processes = (os.cpu_count() or 1) if value == 'auto' else int(value)
+    except ValueError:
+        if _bad_parse_processes != value:
+            _bad_parse_processes = value
+            print(f"[PARSE] Invalid SCRAPER_PARSE_PROCESSES={value!r} - parsing in-process")
+        return 0
+    # A single worker process only adds pickling overhead
+    return processes if processes >= 2 else 0
+
+def create_parse_pool(processes):
+    """Spawn-based process pool, or None where the host cannot run one (no /dev/shm, sandboxed functions)"""
+    try:
+        # spawn: forking a process that already runs fetch threads can copy held locks
+        return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+    except (OSError, NotImplementedError, PermissionError) as e:
+        print(f"[PARSE] Process pool unavailable ({e}) - parsing in-process")
+        return None
+
+def _get_parse_pool():
+    global _parse_pool, _parse_pool_unavailable
+    with _parse_pool_lock:
+        if _parse_pool is None and not _parse_pool_unavailable and parse_processes():
+            _parse_pool = create_parse_pool(parse_processes())
+            _parse_pool_unavailable = _parse_pool is None
+        return _parse_pool
+
+def shutdown_parse_pool(unavailable=False):
+    """Stop the pool; unavailable=True keeps this process parsing in-process from now on"""
+    global _parse_pool, _parse_pool_unavailable
+    with _parse_pool_lock:
+        pool, _parse_pool = _parse_pool, None
+        _parse_pool_unavailable = unavailable
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def pack_matches(matches):
+    return [tuple(match[field] for field in MATCH_RECORD_FIELDS) for match in matches]
+
+def unpack_matches(records):
+    return [dict(zip(MATCH_RECORD_FIELDS, record)) for record in records]
+
+def parse_page_records(content, url, round_name=None):
+    """
+    Process pool worker: raw HTML -> {'matches': [record tuples]}. Without round_name the page
+    is a league's main results page and 'rounds' and 'current_round' are returned as well.
+    """
+    if round_name is None:
+        page_data = _parse_main_page(content, url)
+    else:
+        page_data = _parse_round_page(content, {'name': round_name, 'url': url})
+    page_data['matches'] = pack_matches(page_data['matches'])
+    return page_data
+
+def parse_page(content, url, round_name=None):
+    """Parse a fetched page on the process pool (inline when there is none); same result as _parse_*_page"""
+    pool = _get_parse_pool()
+    page_data = None
+    if pool is not None:
+        try:
+            # Only this thread waits - the GIL is free for the other fetch threads meanwhile
+            page_data = pool.submit(parse_page_records, content, url, round_name).result()
+            metrics.MATCHES_PARSED.inc(len(page_data['matches']))
+        except BrokenProcessPool as e:
+            print(f"[PARSE] Process pool failed ({e}) - parsing in-process")
+            shutdown_parse_pool()
+        except (OSError, NotImplementedError) as e:
+            # Workers are spawned on first submit - a host without process support fails here
+            print(f"[PARSE] Process pool cannot start workers ({e}) - parsing in-process")
+            shutdown_parse_pool(unavailable=True)
+    if page_data is None:
+        page_data = parse_page_records(content, url, round_name)
+    page_data['matches'] = unpack_matches(page_data['matches'])
+    return page_data
+
+def get_fetch_engine(requested_engine=None):
+    """Return 'asyncio' or 'threads' - the engine used to fan out round fetches"""
+    engine = (requested_engine or os.environ.get('SCRAPER_FETCH_ENGINE', 'threads')).lower()
+    if engine == 'asyncio' and not AIOHTTP_AVAILABLE:
+        print("[WARNING] aiohttp not installed - falling back to thread pool fetch engine")
+        return 'threads'
+    return 'asyncio' if engine == 'asyncio' else 'threads'
+
+def fetch_round(session, round_opt):
+    """Fetch and parse a single round page using the shared requests session"""
+    try:
+        cached = load_cached_parse(round_opt['url'], round_opt['name'])
+        # Uporabimo isto retry logiko
+        for attempt in range(2):
+            try:
+                # Tempo določa skupni omejevalnik (tudi ponovni poskus)
+                acquire_request_slot()
+
+                started = time.perf_counter()
+                try:
+                    r = session.get(round_opt['url'], timeout=10, allow_redirects=True,
+                                    headers=conditional_request_headers(cached))
+                except requests.exceptions.RequestException:
+                    metrics.observe_upstream('threads', attempt, started)
+                    raise
+                metrics.observe_upstream('threads', attempt, started, r.status_code, len(r.content))
+                content_type = r.headers.get('content-type', '').lower()
+                challenge = r.status_code == 200 and looks_like_cloudflare_challenge(r.text)
+                record_upstream_response(r.status_code, challenge, r.headers.get('Retry-After'))
+                if challenge:
+                    session.needs_rewarm = True
+                    print(f"Attempt {attempt + 1} for {round_opt['name']} got a Cloudflare challenge")
+                    continue
+                if r.status_code == 304 or (r.status_code == 200 and 'text/html' in content_type):
+                    page_data = parse_page_with_cache(round_opt['url'], r.status_code, r.headers, r.content,
+                                                      lambda content: parse_page(content, round_opt['url'],
+                                                                                 round_opt['name']),
+                                                      cached, parse_key=round_opt['name'])
+                    if page_data is not None:
+                        return page_data['matches']
+                r.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"Attempt {attempt + 1} failed for {round_opt['name']}: {e}")
+                if attempt == 1:
+                    raise
+                continue
+        return []
+    except Exception as e:
+        print(f"Error fetching {round_opt['name']}: {e}")
+        return []
+
+def fetch_rounds_threaded(session, round_options, max_workers, on_result=None):
+    """Fetch round pages over a thread pool sharing one requests session"""
+    round_results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_round = {executor.submit(fetch_round, session, round_opt): round_opt for round_opt in round_options}
+        for future in as_completed(future_to_round):
+            if on_result:
+                on_result(future_to_round[future], future.result())
+            else:
+                round_results.append(future.result())
+    return round_results
+
+async def _fetch_round_async(session, http, host_limits, round_opt, timeout):
+    """Async counterpart of fetch_round - same retry rules, parsing runs off the event loop"""
+    host = urlparse(round_opt['url']).netloc
+    loop = asyncio.get_running_loop()
+    # Cache file read + JSON decode blocks - keep it off the event loop, once per round
+    cached = await loop.run_in_executor(None, load_cached_parse, round_opt['url'], round_opt['name'])
+    for attempt in range(2):
+        try:
+            async with host_limits[host]:
+                # Reserve inside the per-host cap so queued tasks see the limiter's current rate
+                await acquire_request_slot_async()
+                started = time.perf_counter()
+                async with http.get(round_opt['url'], timeout=timeout, allow_redirects=True,
+                                    headers=conditional_request_headers(cached)) as r:
+                    content = await r.read()
+                    metrics.observe_upstream('asyncio', attempt, started, r.status, len(content))
+                    if r.status in THROTTLE_STATUS_CODES:
+                        record_upstream_response(r.status, retry_after=r.headers.get('Retry-After'))
+                    r.raise_for_status()
+                    content_type = r.headers.get('content-type', '').lower()
+                    status = r.status
+                    response_headers = dict(r.headers)
+            challenge = status == 200 and looks_like_cloudflare_challenge(content.decode('utf-8', errors='replace'))
+            record_upstream_response(status, challenge)
+            if challenge:
+                # Cookies carried over from the requests session are no longer trusted
+                session.needs_rewarm = True
+                print(f"Attempt {attempt + 1} for {round_opt['name']} got a Cloudflare challenge")
+                continue
+            if status == 304 or (status == 200 and 'text/html' in content_type):
+                page_data = await loop.run_in_executor(
+                    None, parse_page_with_cache, round_opt['url'], status, response_headers, content,
+                    lambda page_content: parse_page(page_content, round_opt['url'], round_opt['name']),
+                    cached, round_opt['name'])
+                if page_data is not None:
+                    return page_data['matches']
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if not isinstance(e, aiohttp.ClientResponseError):
+                metrics.observe_upstream('asyncio', attempt, started)
+            print(f"Attempt {attempt + 1} failed for {round_opt['name']}: {e}")
+            if attempt == 1:
+                print(f"Error fetching {round_opt['name']}: {e}")
+                return []
+    return []
+
+async def _fetch_rounds_async_main(session, round_options, max_per_host, on_result=None):
+    timeout = aiohttp.ClientTimeout(
+        total=float(os.environ.get('SCRAPER_ASYNC_REQUEST_TIMEOUT', 10)),
+        connect=5)
+    deadline = float(os.environ.get('SCRAPER_ASYNC_DEADLINE', 120))
+    # Pooled keep-alive connections, capped per host so we never exceed the configured concurrency
+    connector = aiohttp.TCPConnector(limit=max_per_host * 2, limit_per_host=max_per_host,
+                                     keepalive_timeout=30, ttl_dns_cache=300)
+    host_limits = {}
+    for round_opt in round_options:
+        host_limits.setdefault(urlparse(round_opt['url']).netloc, asyncio.Semaphore(max_per_host))
+
+    # Carry over the warmed-up requests session (headers + Cloudflare cookies)
+    cookies = {cookie.name: cookie.value for cookie in session.cookies}
+    async def fetch_and_report(http, round_opt):
+        matches = await _fetch_round_async(session, http, host_limits, round_opt, timeout)
+        if on_result:
+            # The callback may block (bounded queue) - keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, on_result, round_opt, matches)
+            return []
+        return matches
+
+    async with aiohttp.ClientSession(connector=connector, headers=dict(session.headers), cookies=cookies) as http:
+        tasks = [asyncio.ensure_future(fetch_and_report(http, round_opt)) for round_opt in round_options]
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        if pending:
+            print(f"[WARNING] Async fetch deadline ({deadline:.0f}s) reached, cancelling {len(pending)} round fetches")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        round_results = []
+        for task in done:
+            if task.exception() is not None:
+                print(f"Error fetching round: {task.exception()}")
+                continue
+            round_results.append(task.result())
+        return round_results
+
+def fetch_rounds_async(session, round_options, max_per_host, on_result=None):
+    """Fetch round pages concurrently on an asyncio event loop (aiohttp)"""
+    return asyncio.run(_fetch_rounds_async_main(session, round_options, max_per_host, on_result))
+
+def fetch_round_pages(session, round_options, fetch_engine=None, on_result=None):
+    """
+    Fetch the given round pages with the configured engine; returns one match list per round.
+    With on_result(round_opt, matches) every round is handed over as soon as it is parsed instead.
+    """
+    # Zmanjšajmo število vzporednih zahtev za izogibanje rate limitom;
+    # SCRAPER_MAX_WORKERS je skupni proračun, ki si ga delijo lige, ki se scrapajo hkrati
+    with _league_fanout_lock:
+        active_leagues = max(1, _active_league_scrapes)
+    max_workers = max(1, int(os.environ.get("SCRAPER_MAX_WORKERS", 3)) // active_leagues)
+    engine = get_fetch_engine(fetch_engine)
+    if os.environ.get('SCRAPER_DEBUG', 'false').lower() == 'true':
+        print(f"[DEBUG] Fetching {len(round_options)} rounds with '{engine}' engine, max {max_workers} per host")
+    if engine == 'asyncio':
+        return fetch_rounds_async(session, round_options, max_workers, on_result)
+    return fetch_rounds_threaded(session, round_options, max_workers, on_result)
+
+def iter_round_pages(session, round_options, fetch_engine=None, queue_size=4):
+    """
+    Yield (round_opt, matches) as each round finishes. Fetching runs in a producer thread and
+    blocks once queue_size parsed rounds are waiting, so memory stays bounded.
+    """
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    finished = object()
+
+    def hand_over(round_opt, matches):
+        while not stop.is_set():
+            try:
+                results.put((round_opt, matches), timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            fetch_round_pages(session, round_options, fetch_engine, on_result=hand_over)
         except Exception as e:
-            if debug_mode:
-                print(f"[DEBUG] Homepage visit failed: {e}")
-            # Continue anyway, but log the issue
-        
+            print(f"[ERROR] Round fetch pipeline failed: {e}")
+        finally:
+            results.put(finished)
+
+    producer = threading.Thread(target=produce, name='round-fetch-producer', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = results.get()
+            if item is finished:
+                break
+            yield item
+    finally:
+        # Consumer stopped early (error or close) - let the producer drain out
+        stop.set()
+        while producer.is_alive():
+            try:
+                results.get(timeout=0.5)
+            except queue.Empty:
+                pass
+
+def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id_for_caching=None, fetch_engine=None):
+    debug_mode = os.environ.get('SCRAPER_DEBUG', 'false').lower() == 'true'
+    
+    if debug_mode:
+        print(f"[DEBUG] Starting scrape for: {url_to_scrape}")
+        print(f"[DEBUG] Fetch all rounds: {fetch_all_rounds_data}")
+    
+    page_matches = []
+    all_match_data_for_leaderboard = [] if fetch_all_rounds_data else None
+    available_rounds = []
+    current_round_info = {'name': "N/A", 'url': url_to_scrape, 'id': None}
+
+    # Raises UpstreamCircuitOpen while the upstream is blocking us - callers fall back to cached data
+    enter_upstream_circuit()
+    upstream_reached = False
+    upstream_error = None
+    session = checkout_scraper_session()
+    # The retry ladder below rewrites the session headers - put the warmed profile back before pooling
+    pooled_headers = session.headers.copy()
+
+    try:
         # Update headers for same-origin navigation
         session.headers.update({
             'Referer': BASE_URL,
             'Sec-Fetch-Site': 'same-origin'
         })
         
+        cached = load_cached_parse(url_to_scrape)
         # Enhanced retry mechanism with multiple strategies
         for attempt in range(5):  # Increased retry attempts
             try:
@@ -360,35 +1309,39 @@ def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id
                         'Connection': 'keep-alive'
                     }
                 
-                # Progressive delay: longer waits for later attempts
-                if attempt > 0:
-                    # Exponential backoff with jitter
-                    base_delay = 2 ** (attempt - 1)  # 1, 2, 4, 8 seconds base
-                    jitter = random.uniform(0.5, 2.0)
-                    delay = min(base_delay * jitter, 20)  # Cap at 20 seconds
+                # Pacing and back-off between attempts come from the shared rate limiter
+                wait = reserve_request_slot()
+                if wait > 0:
                     if debug_mode:
-                        print(f"[DEBUG] Retry attempt {attempt} delay: {delay:.1f}s")
-                    time.sleep(delay)
+                        print(f"[DEBUG] Rate limiter wait before attempt {attempt + 1}: {wait:.1f}s")
+                    time.sleep(wait)
                 
                 # Make the request with different timeout strategies
                 timeout_val = 20 + (attempt * 5)  # Increase timeout for later attempts
-                response = session.get(url_to_scrape, timeout=timeout_val, allow_redirects=True)
-                
-                # Enhanced Cloudflare detection
-                cloudflare_indicators = [
-                    "One moment, please",
-                    "Please wait while your request is being verified",
-                    "DDoS protection by Cloudflare",
-                    "cf-browser-verification",
-                    "Checking your browser",
-                    "__cf_bm"
-                ]
+                started = time.perf_counter()
+                try:
+                    response = session.get(url_to_scrape, timeout=timeout_val, allow_redirects=True,
+                                           headers=conditional_request_headers(cached))
+                except requests.exceptions.RequestException:
+                    metrics.observe_upstream('main_page', attempt, started)
+                    raise
+                metrics.observe_upstream('main_page', attempt, started, response.status_code, len(response.content))
+
+                if response.status_code == 304:
+                    record_upstream_response(response.status_code)
+                    if debug_mode:
+                        print(f"[DEBUG] 304 Not Modified - reusing cached parse for {url_to_scrape}")
+                    break
                 
-                is_cloudflare_challenge = any(indicator in response.text for indicator in cloudflare_indicators)
+                is_cloudflare_challenge = looks_like_cloudflare_challenge(response.text)
+                record_upstream_response(response.status_code, is_cloudflare_challenge,
+                                         response.headers.get('Retry-After'))
                 
                 if is_cloudflare_challenge:
                     if debug_mode:
                         print(f"[DEBUG] Cloudflare challenge detected on attempt {attempt + 1}")
+                    # Cookies are no longer trusted - re-warm on the next scrape
+                    session.needs_rewarm = True
                     if attempt == 4:  # Last attempt
                         raise Exception("Cloudflare bot detection preventing access")
                     continue
@@ -400,8 +1353,8 @@ def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id
                         print(f"[DEBUG] Attempt {attempt + 1} - Response status: {response.status_code}, content-type: {content_type}, length: {len(response.content)}")
                     
                     if 'text/html' in content_type and len(response.content) > 1000:  # Ensure it's substantial content
-                        soup = BeautifulSoup(response.content, 'html.parser')
                         if debug_mode:
+                            soup = BeautifulSoup(response.content, 'html.parser')
                             print(f"[DEBUG] Successfully parsed HTML, title: {soup.title.string if soup.title else 'No title'}")
                             # Check for tables immediately to debug the issue
                             fixtures_table = soup.find('table', class_='fixtures-results')
@@ -441,63 +1394,36 @@ def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id
                 continue
         else:
             raise Exception("All retry attempts exhausted")
-        available_rounds, current_round_info_from_page = extract_round_options_and_current(soup, url_to_scrape)
+        upstream_reached = True
+        page_data = parse_page_with_cache(url_to_scrape, response.status_code, response.headers, response.content,
+                                          lambda content: _parse_main_page(content, url_to_scrape), cached)
+        if page_data is None:
+            raise Exception("Server returned 304 Not Modified but no cached copy exists")
+        available_rounds = page_data['rounds']
         if debug_mode:
             print(f"[DEBUG] Found {len(available_rounds)} rounds")
-        if current_round_info_from_page['name'] != "N/A":
-            current_round_info = current_round_info_from_page
+        if page_data['current_round']['name'] != "N/A":
+            current_round_info = page_data['current_round']
         if debug_mode:
             print(f"[DEBUG] Current round info: {current_round_info}")
-        page_matches = _parse_matches_from_soup(soup, current_round_info['name'], current_round_info['url'])
+        page_matches = page_data['matches']
         if debug_mode:
             print(f"[DEBUG] Parsed {len(page_matches)} matches from main page")
 
         if fetch_all_rounds_data and available_rounds:
             all_match_data_for_leaderboard = []
             unique_match_identifiers = set()
-            # Zmanjšajmo število vzporednih zahtev za izogibanje rate limitom
-            max_workers = int(os.environ.get("SCRAPER_MAX_WORKERS", 3))
+            rounds_to_fetch = [r for r in available_rounds if r['url'] != url_to_scrape]
+            round_results = fetch_round_pages(session, rounds_to_fetch, fetch_engine)
 
-            def fetch_round(round_opt):
-                try:
-                    if round_opt['url'] == url_to_scrape:
-                        return page_matches
-                    
-                    # Uporabimo isto retry logiko
-                    for attempt in range(2):
-                        try:
-                            # Kratka zakava med zahtevki
-                            if attempt > 0:
-                                time.sleep(random.uniform(0.5, 2))
-                            
-                            r = session.get(round_opt['url'], timeout=10, allow_redirects=True)
-                            if r.status_code == 200:
-                                content_type = r.headers.get('content-type', '').lower()
-                                if 'text/html' in content_type:
-                                    s = BeautifulSoup(r.content, 'html.parser')
-                                    return _parse_matches_from_soup(s, round_opt['name'], round_opt['url'])
-                            r.raise_for_status()
-                        except requests.exceptions.RequestException as e:
-                            print(f"Attempt {attempt + 1} failed for {round_opt['name']}: {e}")
-                            if attempt == 1:
-                                raise
-                            continue
-                    return []
-                except Exception as e:
-                    print(f"Error fetching {round_opt['name']}: {e}")
-                    return []
-
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_round = {executor.submit(fetch_round, round_opt): round_opt for round_opt in available_rounds}
-                for future in as_completed(future_to_round):
-                    matches = future.result()
-                    for match_item in matches:
-                        round_id_for_key = match_item.get('round_name', 'N/A')
-                        match_id_key = (
-                            match_item['home_team'], match_item['away_team'], round_id_for_key, match_item.get('date_str', 'N/A'))
-                        if match_id_key not in unique_match_identifiers:
-                            all_match_data_for_leaderboard.append(match_item)
-                            unique_match_identifiers.add(match_id_key)
+            for matches in round_results:
+                for match_item in matches:
+                    round_id_for_key = match_item.get('round_name', 'N/A')
+                    match_id_key = (
+                        match_item['home_team'], match_item['away_team'], round_id_for_key, match_item.get('date_str', 'N/A'))
+                    if match_id_key not in unique_match_identifiers:
+                        all_match_data_for_leaderboard.append(match_item)
+                        unique_match_identifiers.add(match_id_key)
             # Always include matches from main page, deduped
             for match_item in page_matches:
                 round_id_for_key = match_item.get('round_name', 'N/A')
@@ -508,96 +1434,479 @@ def fetch_lmn_radgona_data(url_to_scrape, fetch_all_rounds_data=False, league_id
                     unique_match_identifiers.add(match_id_key)
     except Exception as e_fatal:
         print(f"Fatal error during scrape: {e_fatal}")
+        if not upstream_reached:
+            upstream_error = str(e_fatal)[:500]
         import traceback
         traceback.print_exc()
+    finally:
+        session.headers = pooled_headers
+        release_scraper_session(session)
+        record_upstream_outcome(upstream_reached, upstream_error)
 
     if debug_mode:
         print(f"[DEBUG] Returning: {len(page_matches)} page matches, {len(all_match_data_for_leaderboard) if all_match_data_for_leaderboard else 'None'} all matches")
     return page_matches, all_match_data_for_leaderboard, available_rounds, current_round_info
 
+def incremental_sync_enabled():
+    return os.environ.get('SCRAPER_INCREMENTAL_SYNC', 'true').lower() == 'true'
+
+def plan_round_sync(league_id, available_rounds, skip_urls=()):
+    """
+    Pick the rounds worth refetching from the matches table: rounds never stored,
+    rounds with unplayed/postponed scores, recent kickoffs, or a stale round_freshness entry.
+    Returns a list of (round_option, reasons).
+    """
+    refresh_plan = get_round_refresh_plan(league_id)
+    planned = []
+    for round_opt in available_rounds:
+        if round_opt['url'] in skip_urls:
+            continue
+        reasons = refresh_plan.get(round_opt['url'], ['not stored'])
+        if reasons:
+            planned.append((round_opt, reasons))
+    return planned
+
+def sync_league_rounds(league_id, available_rounds, current_round_url, fetch_engine=None):
+    """Refetch only the planned rounds of a league and save them; returns (rounds_fetched, change_sets)"""
+    planned = plan_round_sync(league_id, available_rounds, skip_urls={current_round_url})
+    print(f"[SYNC] {league_id}: {len(planned)} of {len(available_rounds)} rounds need a refresh")
+    for round_opt, reasons in planned:
+        print(f"  - {round_opt['name']}: {', '.join(reasons)}")
+    if not planned:
+        return 0, []
+    return len(planned), refresh_rounds(league_id, [round_opt for round_opt, _ in planned], fetch_engine)
+
+def refresh_rounds(league_id, round_options, fetch_engine=None):
+    """Fetch the given rounds and save them to the database; returns the cache_matches change sets"""
+    if not round_options:
+        return []
+    enter_upstream_circuit()
+    session = checkout_scraper_session()
+    round_results = []
+    try:
+        round_results = fetch_round_pages(session, round_options, fetch_engine)
+    finally:
+        release_scraper_session(session)
+        reached = any(round_results)
+        record_upstream_outcome(reached, None if reached else f"none of {len(round_options)} round pages fetched")
+
+    # Empty list = fetch failed or empty page; keep what is stored
+    fetched = {matches[0]['round_url']: matches for matches in round_results if matches}
+    if not fetched:
+        return []
+    return cache_matches_bulk(league_id, fetched, prune=True)
+
+# --- Streaming full-season backfill ---
+def _backfill_checkpoint_path(league_id):
+    return os.path.join(RESPONSE_CACHE_DIR, f"backfill_{league_id}.json")
+
+def load_backfill_checkpoint(league_id):
+    """Round URLs already written by an interrupted backfill of the league"""
+    try:
+        with open(_backfill_checkpoint_path(league_id), 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('done', []))
+    except (OSError, ValueError):
+        return set()
+
+def save_backfill_checkpoint(league_id, done_round_urls):
+    path = _backfill_checkpoint_path(league_id)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'league_id': league_id, 'updated_at': datetime.now().isoformat(),
+                       'done': sorted(done_round_urls)}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARNING] Could not write backfill checkpoint for {league_id}: {e}")
+
+# Rounds fetched per upstream circuit check - a failing batch counts as one failed scrape
+BACKFILL_CIRCUIT_BATCH = int(os.environ.get('SCRAPER_BACKFILL_BATCH', 10))
+
+def backfill_league(league, fetch_engine=None, restart=False):
+    """
+    Full-season scrape as a pipeline: fetch -> parse -> dedupe -> upsert, one round at a time.
+    Every round is committed as soon as it is parsed and recorded in a checkpoint, so an
+    interrupted run resumes where it stopped. Rounds go out in batches of BACKFILL_CIRCUIT_BATCH,
+    each one through the upstream circuit; an open circuit stops the run (resume later).
+    Returns the number of matches written.
+    """
+    if restart:
+        try:
+            os.remove(_backfill_checkpoint_path(league['id']))
+        except OSError:
+            pass
+    done = load_backfill_checkpoint(league['id'])
+
+    page_matches, _, available_rounds, current_round_info = fetch_lmn_radgona_data(
+        league['url'], fetch_all_rounds_data=False, league_id_for_caching=league['id'])
+    if not available_rounds:
+        print(f"[BACKFILL] {league['name']}: no rounds found")
+        return 0
+
+    seen_matches = set()
+    matches_written = 0
+    start = time.time()
+
+    def write_round(round_url, matches):
+        nonlocal matches_written
+        unique = []
+        for match_item in matches:
+            match_id_key = (match_item['home_team'], match_item['away_team'],
+                            match_item.get('round_name', 'N/A'), match_item.get('date_str', 'N/A'))
+            if match_id_key not in seen_matches:
+                seen_matches.add(match_id_key)
+                unique.append(match_item)
+        if unique:
+            cache_matches(league['id'], round_url, unique)
+            matches_written += len(unique)
+        done.add(round_url)
+        save_backfill_checkpoint(league['id'], done)
+
+    if page_matches and current_round_info['url'] not in done:
+        write_round(current_round_info['url'], page_matches)
+    pending = [r for r in available_rounds if r['url'] not in done]
+    print(f"[BACKFILL] {league['name']}: {len(pending)} rounds to fetch, {len(done)} already done")
+
+    session = checkout_scraper_session()
+    try:
+        for batch_start in range(0, len(pending), BACKFILL_CIRCUIT_BATCH):
+            batch = pending[batch_start:batch_start + BACKFILL_CIRCUIT_BATCH]
+            try:
+                enter_upstream_circuit()
+            except UpstreamCircuitOpen as e:
+                print(f"[BACKFILL] {league['name']}: stopping - {e}")
+                break
+            reached = False
+            try:
+                for round_opt, matches in iter_round_pages(session, batch, fetch_engine):
+                    # Empty = fetch failed or nothing to store; leave it out of the checkpoint for the next run
+                    if not matches:
+                        print(f"[BACKFILL] {round_opt['name']}: no matches, will retry on resume")
+                        continue
+                    reached = True
+                    write_round(round_opt['url'], matches)
+                    print(f"[BACKFILL] {round_opt['name']}: ✓ {len(matches)} matches "
+                          f"({len(done)}/{len(available_rounds)} rounds, {time.time() - start:.1f}s)")
+            finally:
+                record_upstream_outcome(reached, None if reached else f"none of {len(batch)} round pages fetched")
+    finally:
+        release_scraper_session(session)
+
+    if all(r['url'] in done for r in available_rounds):
+        try:
+            os.remove(_backfill_checkpoint_path(league['id']))
+        except OSError:
+            pass
+        print(f"[BACKFILL] {league['name']}: ✓ complete, {matches_written} matches written")
+    else:
+        print(f"[BACKFILL] {league['name']}: incomplete - run again to resume")
+    return matches_written
+
+# --- Kickoff-aware scheduling ---
+# A round is scraped shortly after its matches are expected to finish instead of only at the
+# weekend. Checks that find no result yet are retried a few times, then the weekly job takes over.
+KICKOFF_MATCH_DURATION = timedelta(minutes=int(os.environ.get('SCRAPER_MATCH_DURATION_MIN', 60)))
+KICKOFF_RESULT_DELAY = timedelta(minutes=int(os.environ.get('SCRAPER_RESULT_DELAY_MIN', 30)))
+KICKOFF_RETRY_AFTER = timedelta(minutes=int(os.environ.get('SCRAPER_RESULT_RETRY_MIN', 120)))
+KICKOFF_MAX_CHECKS = int(os.environ.get('SCRAPER_RESULT_MAX_CHECKS', 3))
+KICKOFF_COALESCE = timedelta(minutes=60)   # whistles this close together share one scrape
+KICKOFF_LOOKAHEAD_DAYS = 7
+KICKOFF_LOOKBACK = timedelta(hours=24)     # missed checks older than this are left to the weekly job
+SCHEDULER_REPLAN_INTERVAL = timedelta(hours=6)
+
+# (league_id, round_url, cluster) -> {'checks': n, 'last_check': datetime}; cluster is the first
+# expected whistle of a kickoff cluster, so two clusters on the same day keep separate budgets
+_kickoff_check_state = {}
+
+def kickoff_scheduler_enabled():
+    return os.environ.get('SCRAPER_KICKOFF_SCHEDULER', 'true').lower() == 'true'
+
+def expected_result_time(date_obj, time_str):
+    """When the result of a match should be on the site; unknown kickoff times fall back to 23:00"""
+    try:
+        kickoff = datetime.combine(date_obj, datetime.strptime((time_str or '').strip(), '%H:%M').time())
+    except ValueError:
+        return datetime.combine(date_obj, datetime.min.time()) + timedelta(hours=23)
+    return kickoff + KICKOFF_MATCH_DURATION + KICKOFF_RESULT_DELAY
+
+def _coalesce_whistles(whistles):
+    """Yield (first, last) whistle per cluster of sorted whistle times; the last one is the due time"""
+    group_start = group_end = None
+    for whistle in whistles:
+        if group_start is not None and whistle - group_start > KICKOFF_COALESCE:
+            yield group_start, group_end
+            group_start = None
+        if group_start is None:
+            group_start = whistle
+        group_end = whistle
+    if group_end is not None:
+        yield group_start, group_end
+
+def plan_kickoff_checks(now=None):
+    """
+    Build the queue of targeted round scrapes from unplayed kickoffs in the matches table.
+    Returns checks sorted by due time: {'due', 'league_id', 'round_url', 'round_name', 'cluster'}.
+    """
+    now = now or datetime.now()
+    rows = get_unplayed_kickoffs(now.date() - timedelta(days=1), now.date() + timedelta(days=KICKOFF_LOOKAHEAD_DAYS))
+
+    whistles = {}
+    for row in rows:
+        key = (row['league_id'], row['round_url'])
+        whistles.setdefault(key, {'round_name': row['round_name'], 'times': []})
+        whistles[key]['times'].append(expected_result_time(row['date_obj'], row['time']))
+
+    checks = []
+    for (league_id, round_url), info in whistles.items():
+        for cluster, due in _coalesce_whistles(sorted(info['times'])):
+            state = _kickoff_check_state.get((league_id, round_url, cluster))
+            if state and due <= state['last_check']:
+                # Already scraped after this whistle but the result was not there yet
+                if state['checks'] >= KICKOFF_MAX_CHECKS:
+                    continue
+                due = state['last_check'] + KICKOFF_RETRY_AFTER
+            elif due < now - KICKOFF_LOOKBACK:
+                continue
+            checks.append({'due': due, 'league_id': league_id, 'round_url': round_url,
+                           'round_name': info['round_name'], 'cluster': cluster})
+    # Several clusters can collapse onto the same retry time - keep one per round and due time
+    unique_checks = {(c['league_id'], c['round_url'], c['due']): c for c in checks}
+    return sorted(unique_checks.values(), key=lambda c: c['due'])
+
+def run_kickoff_checks(due_checks, fetch_engine=None):
+    """Scrape the rounds of all due checks (one fetch per round) and remember the attempt"""
+    now = datetime.now()
+    rounds_by_league = {}
+    for check in due_checks:
+        rounds_by_league.setdefault(check['league_id'], {})[check['round_url']] = check['round_name']
+        key = (check['league_id'], check['round_url'], check['cluster'])
+        state = _kickoff_check_state.setdefault(key, {'checks': 0, 'last_check': now})
+        state['checks'] += 1
+        state['last_check'] = now
+
+    for league_id, rounds in rounds_by_league.items():
+        print(f"[KICKOFF] {league_id}: checking results for {', '.join(rounds.values())}")
+        try:
+            summary = summarize_changes(refresh_rounds(
+                league_id, [{'name': name, 'url': url, 'id': None} for url, name in rounds.items()], fetch_engine))
+            print(f"[KICKOFF] {league_id}: ✓ {summary['score_changes']} new results, {summary['new']} new and "
+                  f"{summary['rescheduled']} rescheduled matches")
+        except Exception as e:
+            print(f"[KICKOFF] {league_id}: ERROR {e}")
+
+    # Forget clusters that are fully behind us
+    for key in [k for k in _kickoff_check_state if k[2] < now - KICKOFF_LOOKBACK - timedelta(days=1)]:
+        del _kickoff_check_state[key]
+
+# --- Parallel league fan-out (scheduler + cron endpoint) ---
+LEAGUE_CONCURRENCY = int(os.environ.get('SCRAPER_LEAGUE_CONCURRENCY', len(LEAGUES)))
+LEAGUE_DEADLINE = float(os.environ.get('SCRAPER_LEAGUE_DEADLINE', 50))   # fits serverless HTTP timeouts
+SCHEDULED_LEAGUE_DEADLINE = 900                                          # the scheduler has no HTTP caller waiting
+
+_league_fanout_lock = threading.Lock()
+_active_league_scrapes = 0
+
+def _league_result(league, status='pending', error=None):
+    return {
+        'id': league['id'],
+        'name': league['name'],
+        'status': status,
+        'matches_scraped': 0,
+        'matches_saved': 0,
+        'rounds_synced': 0,
+        'current_round': None,
+        'changes': None,
+        'error': error,
+        'timings': {}
+    }
+
+def _scrape_league(league, sync_rounds, started, abandoned):
+    """
+    Scrape one league's current round (and optionally the rounds that can still change) into the database.
+    Once `abandoned` is set (run deadline passed) the league stops before its next step.
+    """
+    global _active_league_scrapes
+    started[league['id']] = time.monotonic()
+    with _league_fanout_lock:
+        _active_league_scrapes += 1
+    result = _league_result(league)
+    try:
+        if abandoned.is_set():
+            result['status'] = 'abandoned'
+            return result
+        step_start = time.monotonic()
+        page_matches, _, available_rounds, current_round_info = fetch_lmn_radgona_data(
+            league['url'], fetch_all_rounds_data=False, league_id_for_caching=league['id'])
+        result['timings']['fetch_seconds'] = round(time.monotonic() - step_start, 2)
+        result['matches_scraped'] = len(page_matches)
+        result['current_round'] = current_round_info.get('name', 'N/A')
+        print(f"[{league['name']}] ✓ Scraped {len(page_matches)} matches from: {current_round_info['name']} "
+              f"({len(available_rounds)} rounds available)")
+
+        if not page_matches:
+            result['status'] = 'success_no_matches'
+            return result
+        if abandoned.is_set():
+            result['status'] = 'abandoned'
+            print(f"[{league['name']}] Abandoned after fetch - run deadline passed, nothing saved")
+            return result
+        if DATABASE_AVAILABLE:
+            step_start = time.monotonic()
+            change_sets = [cache_matches(league['id'], current_round_info['url'], page_matches, prune=True)]
+            result['matches_saved'] = len(page_matches)
+            result['timings']['save_seconds'] = round(time.monotonic() - step_start, 2)
+            if sync_rounds and not abandoned.is_set():
+                step_start = time.monotonic()
+                rounds_fetched, synced = sync_league_rounds(league['id'], available_rounds, current_round_info['url'])
+                result['rounds_synced'] = rounds_fetched
+                result['matches_saved'] += sum(c['matches'] for c in synced)
+                change_sets.extend(synced)
+                result['timings']['sync_seconds'] = round(time.monotonic() - step_start, 2)
+            result['changes'] = summarize_changes(change_sets)
+        else:
+            print(f"[{league['name']}] Database not available - matches not saved")
+        result['status'] = 'success'
+    except UpstreamCircuitOpen as e:
+        result['status'] = 'circuit_open'
+        result['error'] = str(e)
+        print(f"[{league['name']}] Skipped - {e}")
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+        print(f"[{league['name']}] ERROR: Failed to scrape - {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        with _league_fanout_lock:
+            _active_league_scrapes -= 1
+        result['timings']['total_seconds'] = round(time.monotonic() - started[league['id']], 2)
+        metrics.LEAGUE_SCRAPE_SECONDS.observe(time.monotonic() - started[league['id']],
+                                              league=league['id'], status=result['status'])
+    return result
+
+def scrape_leagues(leagues=None, sync_rounds=False, deadline=None):
+    """
+    Scrape all leagues concurrently on an executor owned by this run.
+    `deadline` counts from submission: leagues still queued or running when it passes are
+    reported as 'abandoned' - queued ones are cancelled, running ones stop before their next
+    step - so the call never takes longer than the deadline plus one in-flight request.
+    Returns {'timestamp', 'status', 'leagues': [...], totals..., 'duration_seconds'}.
+    """
+    leagues = leagues or LEAGUES
+    deadline = deadline or LEAGUE_DEADLINE
+    run_start = time.monotonic()
+    started = {}
+    abandoned = threading.Event()
+    # A fresh executor per run: an abandoned league must not hold a worker that the next run queues behind
+    executor = ThreadPoolExecutor(max_workers=max(1, min(LEAGUE_CONCURRENCY, len(leagues))), thread_name_prefix='league')
+    futures = {executor.submit(_scrape_league, league, sync_rounds, started, abandoned): league for league in leagues}
+    try:
+        done, pending = wait(futures, timeout=deadline)
+    finally:
+        abandoned.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    league_results = {futures[future]['id']: future.result() for future in done}
+    for future in pending:
+        league = futures[future]
+        league_start = started.get(league['id'])
+        reason = "while running" if league_start is not None else "before it started"
+        league_results[league['id']] = _league_result(
+            league, status='abandoned', error=f"Deadline of {deadline:.0f}s exceeded {reason}")
+        if league_start is not None:
+            league_results[league['id']]['timings']['total_seconds'] = round(time.monotonic() - league_start, 2)
+        print(f"[{league['name']}] ABANDONED - deadline of {deadline:.0f}s exceeded {reason}")
+
+    ordered = [league_results[league['id']] for league in leagues]
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'status': 'success' if all(l['status'] in ['success', 'success_no_matches'] for l in ordered) else 'partial_failure',
+        'leagues': ordered,
+        'total_matches_scraped': sum(l['matches_scraped'] for l in ordered),
+        'total_matches_saved': sum(l['matches_saved'] for l in ordered),
+        'total_rounds_synced': sum(l['rounds_synced'] for l in ordered),
+        'duration_seconds': round(time.monotonic() - run_start, 2)
+    }
+
 def scheduled_scrape_job():
     """
     Scrape job that runs on scheduled times (Saturday and Sunday at 23:00)
-    Fetches only the current round data for Liga A and Liga B and saves to database
+    Fetches the current round for Liga A and Liga B, then refetches only the older
+    rounds that can still change (see plan_round_sync) and saves them to database
     """
     print(f"\n{'='*60}")
     print(f"[SCHEDULED SCRAPE] Starting at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
     
-    # Define leagues to scrape
-    leagues = [
-        {
-            'id': 'liga_a',
-            'name': 'Liga A',
-            'url': 'https://www.lmn-radgona.si/index.php/ct-menu-item-7/razpored-liga-a'
-        },
-        {
-            'id': 'liga_b',
-            'name': 'Liga B',
-            'url': 'https://www.lmn-radgona.si/index.php/2017-08-11-13-54-06/razpored-liga-b'
-        }
-    ]
-    
-    total_matches_scraped = 0
-    total_matches_saved = 0
-    
-    for league in leagues:
-        try:
-            print(f"\n{'─'*60}")
-            print(f"[{league['name']}] Starting scrape...")
-            print(f"{'─'*60}")
-            
-            # Fetch only current round (fetch_all_rounds_data=False)
-            page_matches, _, available_rounds, current_round_info = fetch_lmn_radgona_data(
-                league['url'], 
-                fetch_all_rounds_data=False
-            )
-            
-            total_matches_scraped += len(page_matches)
-            
-            print(f"\n[{league['name']}] ✓ Scraped {len(page_matches)} matches from: {current_round_info['name']}")
-            print(f"[{league['name']}] Available rounds: {len(available_rounds)}")
-            
-            # Display some match data
-            if page_matches:
-                print(f"\n[{league['name']}] Sample matches from {current_round_info['name']}:")
-                for i, match in enumerate(page_matches[:3]):
-                    print(f"  {i+1}. {match['home_team']} {match['score_str']} {match['away_team']} - {match['date_str']} {match['time']}")
-                if len(page_matches) > 3:
-                    print(f"  ... and {len(page_matches) - 3} more matches")
-            
-            # Save to database
-            if DATABASE_AVAILABLE and page_matches:
-                try:
-                    print(f"\n[{league['name']}] Saving {len(page_matches)} matches to database...")
-                    cache_matches(league['id'], current_round_info['url'], page_matches)
-                    total_matches_saved += len(page_matches)
-                    print(f"[{league['name']}] ✓ Successfully saved to database")
-                except Exception as db_error:
-                    print(f"[{league['name']}] DATABASE ERROR: {db_error}")
-                    import traceback
-                    traceback.print_exc()
-            elif not DATABASE_AVAILABLE:
-                print(f"\n[{league['name']}] Database not available - matches not saved")
-            
-            # Small delay between leagues to be respectful
-            if league != leagues[-1]:  # Don't delay after last league
-                delay = random.uniform(2, 4)
-                print(f"\n[INFO] Waiting {delay:.1f}s before next league...")
-                time.sleep(delay)
-                
-        except Exception as e:
-            print(f"\n[{league['name']}] ERROR: Failed to scrape - {e}")
-            import traceback
-            traceback.print_exc()
+    results = scrape_leagues(sync_rounds=incremental_sync_enabled(), deadline=SCHEDULED_LEAGUE_DEADLINE)
     
     print(f"\n{'='*60}")
     print(f"[SCHEDULED SCRAPE] Completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"[SUMMARY] Total matches scraped: {total_matches_scraped}")
-    print(f"[SUMMARY] Total matches saved: {total_matches_saved}")
+    for league_result in results['leagues']:
+        changes = league_result['changes'] or summarize_changes([])
+        print(f"[SUMMARY] {league_result['name']}: {league_result['status']}, "
+              f"{league_result['matches_saved']} saved ({changes['new']} new, {changes['score_changes']} score changes, "
+              f"{changes['rescheduled']} rescheduled), {league_result['rounds_synced']} older rounds, "
+              f"{league_result['timings'].get('total_seconds', 0):.1f}s")
+    print(f"[SUMMARY] Total matches scraped: {results['total_matches_scraped']}")
+    print(f"[SUMMARY] Total matches saved: {results['total_matches_saved']}")
+    print(f"[SUMMARY] Older rounds refetched: {results['total_rounds_synced']}")
+    print(f"[SUMMARY] Duration: {results['duration_seconds']:.1f}s")
+    rate_status = get_rate_limit_status()
+    print(f"[SUMMARY] Rate limit: {rate_status['rate_per_second']} req/s, "
+          f"{rate_status['throttled_total']} throttled of {rate_status['requests_total']} requests")
     print(f"{'='*60}\n")
 
 
+def _reparse_archived_page(job):
+    """Process pool worker: parse one archived snapshot exactly like a freshly fetched page"""
+    url, path, fetched_at = job
+    with gzip.open(path, 'rb') as f:
+        content = f.read()
+    page_data = parse_page_records(content, url)
+    return url, fetched_at, page_data['current_round']['url'], page_data['matches']
+
+def reparse_archive(league_filter=None, workers=None):
+    """
+    Re-run the parser over the newest archived snapshot of every page and write the
+    results through cache_matches. Returns the number of matches written.
+    """
+    jobs = [job for job in iter_archived_pages()
+            if league_for_url(job[0]) and (not league_filter or league_for_url(job[0]) == league_filter)]
+    print(f"[REPARSE] {len(jobs)} archived pages in {ARCHIVE_DIR}")
+    if not jobs:
+        return 0
+
+    start = time.time()
+    # The main results page and the current round page hold the same round - keep the newest snapshot
+    rounds = {}
+    # Same parse stage as live scrapes; --workers sizes a dedicated pool for this run
+    executor = create_parse_pool(workers) if workers else _get_parse_pool()
+    try:
+        parsed = executor.map(_reparse_archived_page, jobs, chunksize=4) if executor else map(_reparse_archived_page, jobs)
+        for url, fetched_at, round_url, records in parsed:
+            key = (league_for_url(url), round_url)
+            if records and (key not in rounds or fetched_at > rounds[key][0]):
+                rounds[key] = (fetched_at, unpack_matches(records))
+    finally:
+        if workers and executor:
+            executor.shutdown()
+    print(f"[REPARSE] Parsed {len(jobs)} pages into {len(rounds)} rounds in {time.time() - start:.1f}s")
+
+    by_league = defaultdict(dict)
+    for (league_id, round_url), (_, matches) in sorted(rounds.items()):
+        by_league[league_id][round_url] = matches
+    matches_written = 0
+    for league_id, matches_by_round in by_league.items():
+        summary = summarize_changes(cache_matches_bulk(league_id, matches_by_round))
+        matches_written += sum(len(matches) for matches in matches_by_round.values())
+        print(f"[REPARSE] {league_id}: {summary['inserted']} inserted, {summary['updated']} updated, "
+              f"{summary['unchanged']} unchanged")
+    print(f"[REPARSE] ✓ Wrote {matches_written} matches")
+    return matches_written
+
+
 def run_scheduler():
     """
     Runs the scheduler in a loop
@@ -614,27 +1923,69 @@ def run_scheduler():
             print(f"[DATABASE ERROR] Failed to initialize database: {e}")
             print("[WARNING] Continuing without database support")
     
+    try:
+        metrics_server = metrics.start_metrics_server()
+        if metrics_server:
+            print(f"[METRICS] Prometheus metrics on http://{metrics_server.server_address[0]}:"
+                  f"{metrics_server.server_address[1]}/metrics")
+    except OSError as e:
+        print(f"[METRICS] Could not start metrics exporter: {e}")
+
     # Schedule for Saturday at 23:00
     schedule.every().saturday.at("23:00").do(scheduled_scrape_job)
     
     # Schedule for Sunday at 23:00
     schedule.every().sunday.at("23:00").do(scheduled_scrape_job)
+
+    use_kickoffs = DATABASE_AVAILABLE and kickoff_scheduler_enabled()
     
     print("=" * 60)
     print("SCRAPER SCHEDULER STARTED")
     print("=" * 60)
     print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Schedule: Every Saturday and Sunday at 23:00")
-    print(f"Target: Liga A + Liga B - Current round only")
+    if use_kickoffs:
+        print(f"          + each round ~{int((KICKOFF_MATCH_DURATION + KICKOFF_RESULT_DELAY).total_seconds() // 60)} min after kickoff")
+    print(f"Target: Liga A + Liga B - Current round + rounds that can still change")
     print(f"Database: {'✓ Enabled' if DATABASE_AVAILABLE else '✗ Disabled'}")
     print("=" * 60)
     print("\nWaiting for scheduled times...")
     print("(Press Ctrl+C to stop)\n")
     
+    kickoff_checks = []
+    planned_at = None
     try:
         while True:
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+
+            if use_kickoffs:
+                now = datetime.now()
+                try:
+                    if planned_at is None or now - planned_at >= SCHEDULER_REPLAN_INTERVAL:
+                        kickoff_checks = plan_kickoff_checks(now)
+                        planned_at = now
+                        if kickoff_checks:
+                            print(f"[KICKOFF] {len(kickoff_checks)} result checks queued, next at "
+                                  f"{kickoff_checks[0]['due'].strftime('%a %d.%m. %H:%M')}")
+                    due_checks = [c for c in kickoff_checks if c['due'] <= now]
+                    if due_checks:
+                        run_kickoff_checks(due_checks)
+                        # Results and dates may have changed - plan again from the database
+                        kickoff_checks = plan_kickoff_checks()
+                        planned_at = datetime.now()
+                except Exception as e:
+                    print(f"[KICKOFF] Planning failed: {e}")
+                    kickoff_checks = []
+                    planned_at = datetime.now()
+
+            # Sleep until the next useful moment instead of polling every minute
+            idle_seconds = schedule.idle_seconds()
+            wake_in = [3600 if idle_seconds is None else idle_seconds]
+            if use_kickoffs:
+                wake_in.append((planned_at + SCHEDULER_REPLAN_INTERVAL - datetime.now()).total_seconds())
+                if kickoff_checks:
+                    wake_in.append((kickoff_checks[0]['due'] - datetime.now()).total_seconds())
+            time.sleep(min(max(1, min(wake_in)), 3600))
     except KeyboardInterrupt:
         print("\n\n[SCHEDULER] Stopped by user")
 
@@ -642,6 +1993,10 @@ def run_scheduler():
 if __name__ == '__main__':
     import sys
     
+    # Long-running CLI modes parse on the process pool unless SCRAPER_PARSE_PROCESSES says otherwise
+    if len(sys.argv) > 1 and sys.argv[1] in ('--schedule', '--backfill', '--reparse'):
+        os.environ.setdefault('SCRAPER_PARSE_PROCESSES', 'auto')
+
     # Check if running in scheduler mode or test mode
     if len(sys.argv) > 1 and sys.argv[1] == '--schedule':
         # Production mode: run scheduler
@@ -659,6 +2014,35 @@ if __name__ == '__main__':
                 print(f"[DATABASE ERROR] {e}")
                 print("[WARNING] Continuing without database")
         scheduled_scrape_job()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--backfill':
+        # Full season, streamed into the database round by round (resumable)
+        import argparse
+        arg_parser = argparse.ArgumentParser(prog='scraper_radgona.py --backfill')
+        arg_parser.add_argument('--league', choices=[league['id'] for league in LEAGUES])
+        arg_parser.add_argument('--engine', choices=['threads', 'asyncio'])
+        arg_parser.add_argument('--restart', action='store_true', help='ignore the checkpoint of an earlier run')
+        backfill_args = arg_parser.parse_args(sys.argv[2:])
+        if not DATABASE_AVAILABLE:
+            print("[ERROR] Database not available - nothing to write the backfill to")
+            sys.exit(1)
+        init_db_pool()
+        init_db()
+        for league in LEAGUES:
+            if not backfill_args.league or league['id'] == backfill_args.league:
+                backfill_league(league, backfill_args.engine, backfill_args.restart)
+    elif len(sys.argv) > 1 and sys.argv[1] == '--reparse':
+        # Offline mode: rebuild matches from the HTML archive, no network traffic
+        import argparse
+        arg_parser = argparse.ArgumentParser(prog='scraper_radgona.py --reparse')
+        arg_parser.add_argument('--league', choices=[league['id'] for league in LEAGUES])
+        arg_parser.add_argument('--workers', type=int, default=None, help='parser processes (default: SCRAPER_PARSE_PROCESSES)')
+        reparse_args = arg_parser.parse_args(sys.argv[2:])
+        if not DATABASE_AVAILABLE:
+            print("[ERROR] Database not available - nothing to write reparsed matches to")
+            sys.exit(1)
+        init_db_pool()
+        init_db()
+        reparse_archive(reparse_args.league, reparse_args.workers)
     else:
         # Default: show usage information
         print("=" * 60)
@@ -667,16 +2051,18 @@ if __name__ == '__main__':
         print("\nUsage:")
         print("  python scraper_radgona.py --schedule    Start scheduler (runs Sat & Sun at 23:00)")
         print("  python scraper_radgona.py --test-now    Run scrape immediately (for testing)")
+        print("  python scraper_radgona.py --backfill    Stream all rounds into the database (resumable)")
+        print("  python scraper_radgona.py --reparse     Rebuild matches from the local HTML archive")
         print("\nScheduled times:")
         print("  - Saturday at 23:00")
         print("  - Sunday at 23:00")
-        print("  - Scrapes only current round of Liga A + Liga B")
+        print("  - Scrapes current round of Liga A + Liga B, then rounds that can still change")
         print(f"  - Database: {'✓ Available' if DATABASE_AVAILABLE else '✗ Not available'}")
         print("=" * 60)
         
         # Quick test example (without database)
         print("\n--- QUICK TEST (fetching current round only, no database) ---")
-        liga_a_main_results_url = "https://www.lmn-radgona.si/index.php/ct-menu-item-7/razpored-liga-a"
+        liga_a_main_results_url = LEAGUES[0]['url']
         page_m, _, avail_r, curr_r_info = fetch_lmn_radgona_data(liga_a_main_results_url, fetch_all_rounds_data=False)
         print(f"Current Round: {curr_r_info['name']}")
         print(f"Matches found: {len(page_m)}")